@@ -1,7 +1,12 @@
-import json
+import orjson
 from cmdb.audit_hooks import emit_audit
 
 
+def _dumps_sorted(obj) -> str:
+    """Serialize audit change details as stable, human-readable JSON."""
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2).decode()
+
+
 def audit_update_node(label: str, element_id: str, old_props: dict, new_props: dict, user) -> None:
     node_name = new_props.get('name', '')
     changes_detail = {
@@ -18,7 +23,7 @@ def audit_update_node(label: str, element_id: str, old_props: dict, new_props: d
         node_id=element_id,
         node_name=node_name,
         user=user.username if user and user.is_authenticated else 'System',
-        changes=json.dumps(changes_detail, sort_keys=True, indent=2) if changes_detail else "Properties updated",
+        changes=_dumps_sorted(changes_detail) if changes_detail else "Properties updated",
         old_props=old_props,
         new_props=new_props,
     )
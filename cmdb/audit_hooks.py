@@ -1,18 +1,86 @@
+import atexit
+import logging
+import queue
+import threading
+import time
 from typing import Callable, List
 
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 AuditHook = Callable[..., None]
 _audit_hooks: List[AuditHook] = []
 
+# Audit events waiting for the background worker; when full, hooks run inline
+AUDIT_QUEUE_SIZE = 10000
+_audit_queue: "queue.Queue[dict]" = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+_audit_worker = None
+_audit_worker_lock = threading.Lock()
+
 
 def register_audit_hook(hook: AuditHook) -> None:
     if hook not in _audit_hooks:
         _audit_hooks.append(hook)
 
 
-def emit_audit(**kwargs) -> None:
+def _run_audit_hooks(kwargs: dict) -> None:
     for hook in list(_audit_hooks):
         try:
             hook(**kwargs)
-        except Exception as exc:
-            print(f"[DEBUG] Audit hook failed: {exc}")
+        except Exception:
+            logger.exception("Audit hook failed")
+
+
+def _drain_audit_queue() -> None:
+    while True:
+        kwargs = _audit_queue.get()
+        try:
+            _run_audit_hooks(kwargs)
+        finally:
+            _audit_queue.task_done()
+
+
+def _ensure_audit_worker() -> None:
+    global _audit_worker
+    if _audit_worker is not None and _audit_worker.is_alive():
+        return
+    with _audit_worker_lock:
+        if _audit_worker is None or not _audit_worker.is_alive():
+            _audit_worker = threading.Thread(
+                target=_drain_audit_queue, name='audit-hooks', daemon=True
+            )
+            _audit_worker.start()
+
+
+def flush_audit(timeout: float = 5.0) -> bool:
+    """Wait up to timeout seconds for queued audit events; return True if all were handled."""
+    deadline = time.monotonic() + timeout
+    while _audit_queue.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def emit_audit(**kwargs) -> None:
+    """
+    Pass an audit event to the registered hooks.
+
+    Hooks (which typically write an audit node to GraphDB) run on a background
+    thread so the write is off the request path, unless AUDIT_HOOKS_ASYNC is
+    disabled or the queue is full.
+    """
+    if not _audit_hooks:
+        return
+    if not getattr(settings, 'AUDIT_HOOKS_ASYNC', True):
+        _run_audit_hooks(kwargs)
+        return
+    _ensure_audit_worker()
+    try:
+        _audit_queue.put_nowait(kwargs)
+    except queue.Full:
+        _run_audit_hooks(kwargs)
+
+
+atexit.register(flush_audit)
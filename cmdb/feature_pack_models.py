@@ -8,6 +8,7 @@ from neomodel import (
 )
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
+import json
 import os
 
 
@@ -24,6 +25,7 @@ class FeaturePackNode(StructuredNode):
         last_synced: Last time this was synced to GraphDB
         config: Full configuration from config.py (FEATURE_PACK_CONFIG)
         types: List of type labels provided by this pack
+        content_hash: sha256 of the pack's types.json and config.py when last synced
     """
     name = StringProperty(unique_index=True, required=True)
     display_name = StringProperty()
@@ -34,6 +36,7 @@ class FeaturePackNode(StructuredNode):
     config = JSONProperty(default=dict)
     types = JSONProperty(default=list)  # List of type labels from types.json
     version = StringProperty(default="0.0.0")
+    content_hash = StringProperty()
     
     @classmethod
     def get_or_create_pack(cls, name: str, **kwargs) -> 'FeaturePackNode':
@@ -61,6 +64,30 @@ class FeaturePackNode(StructuredNode):
     def get_enabled_packs(cls) -> List['FeaturePackNode']:
         """Get only enabled feature packs."""
         return list(cls.nodes.filter(enabled=True))
+
+    @classmethod
+    def get_pack_states(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the enabled flag, last_modified time and content hash of every pack in one query.
+
+        Returns:
+            Dictionary keyed by pack name with 'enabled', 'last_modified'
+            (timezone-aware datetime or None) and 'content_hash' values
+        """
+        results, _ = db.cypher_query(
+            "MATCH (p:FeaturePackNode) RETURN p.name, p.enabled, p.last_modified, p.content_hash"
+        )
+        states = {}
+        for name, enabled, last_modified, content_hash in results:
+            states[name] = {
+                'enabled': bool(enabled),
+                'content_hash': content_hash,
+                'last_modified': (
+                    datetime.fromtimestamp(last_modified, tz=timezone.utc)
+                    if last_modified is not None else None
+                ),
+            }
+        return states
     
     def enable(self):
         """Enable this feature pack."""
@@ -91,7 +118,8 @@ class TypeDefinitionNode(StructuredNode):
 
 def sync_feature_pack_to_db(pack_name: str, pack_path: str, 
                             config: Optional[Dict] = None,
-                            types_data: Optional[Dict] = None) -> FeaturePackNode:
+                            types_data: Optional[Dict] = None,
+                            content_hash: Optional[str] = None) -> FeaturePackNode:
     """
     Sync a feature pack from filesystem to GraphDB.
     
@@ -100,10 +128,16 @@ def sync_feature_pack_to_db(pack_name: str, pack_path: str,
         pack_path: Filesystem path to the pack
         config: Configuration from config.py (FEATURE_PACK_CONFIG)
         types_data: Type definitions from types.json (stored for reference, not used for queries)
+        content_hash: Hash of the pack's source files; read from pack_path when not given
     
     Returns:
         The created or updated FeaturePackNode
     """
+    if content_hash is None:
+        # Without a stored hash should_sync_pack falls back to comparing mtimes
+        from core.apps import _read_pack_sources
+        content_hash = _read_pack_sources(pack_path)[1]
+
     # Get last modified time of the directory (use UTC timezone)
     last_modified = datetime.fromtimestamp(os.path.getmtime(pack_path), tz=timezone.utc)
     
@@ -121,12 +155,61 @@ def sync_feature_pack_to_db(pack_name: str, pack_path: str,
         last_modified=last_modified,
         config=config_to_store,
         types=list(types_data.keys()) if types_data else [],
-        version=version
+        version=version,
+        content_hash=content_hash,
     )
     
     return pack_node
 
 
+def sync_feature_packs_to_db_bulk(packs: List[Dict[str, Any]]) -> int:
+    """
+    Sync several feature packs from filesystem to GraphDB in one query.
+
+    Args:
+        packs: Dictionaries with the sync_feature_pack_to_db arguments
+            (pack_name, pack_path, config, types_data, content_hash)
+
+    Returns:
+        Number of packs written
+    """
+    if not packs:
+        return 0
+
+    now = datetime.now(timezone.utc).timestamp()
+    rows = []
+    for pack in packs:
+        config = pack.get('config')
+        types_data = pack.get('types_data')
+        version = config.get('version', '0.0.0') if config else '0.0.0'
+        config_to_store = dict(config or {})
+        config_to_store['version'] = version
+        rows.append({
+            'name': pack['pack_name'],
+            'props': {
+                'display_name': config.get('name', pack['pack_name']) if config else pack['pack_name'],
+                'path': pack['pack_path'],
+                'last_modified': os.path.getmtime(pack['pack_path']),
+                'last_synced': now,
+                'config': json.dumps(config_to_store, default=str),
+                'types': json.dumps(list(types_data.keys()) if types_data else []),
+                'version': version,
+                'content_hash': pack.get('content_hash'),
+            },
+        })
+
+    db.cypher_query(
+        """
+        UNWIND $packs AS p
+        MERGE (n:FeaturePackNode {name: p.name})
+        ON CREATE SET n.enabled = true
+        SET n += p.props
+        """,
+        {'packs': rows},
+    )
+    return len(rows)
+
+
 def load_feature_packs_from_db() -> Dict[str, Dict[str, Any]]:
     """
     Load all enabled feature packs from GraphDB.
@@ -149,31 +232,47 @@ def load_feature_packs_from_db() -> Dict[str, Dict[str, Any]]:
     return result
 
 
-def should_sync_pack(pack_name: str, pack_path: str) -> bool:
+def should_sync_pack(pack_name: str, pack_path: str,
+                     pack_states: Optional[Dict[str, Dict[str, Any]]] = None,
+                     content_hash: Optional[str] = None) -> bool:
     """
-    Check if a feature pack needs to be synced based on modification time.
+    Check if a feature pack needs to be synced based on its content hash,
+    or on modification time when either side has no hash.
     
     Args:
         pack_name: Name of the feature pack
         pack_path: Filesystem path to the pack
+        pack_states: Optional result of FeaturePackNode.get_pack_states(),
+            used instead of querying GraphDB for this pack
+        content_hash: Hash of the pack's source files on disk
     
     Returns:
         True if pack should be synced (new or modified), False otherwise
     """
-    pack_node = FeaturePackNode.nodes.get_or_none(name=pack_name)
+    if pack_states is not None:
+        pack_state = pack_states.get(pack_name)
+        db_mtime = pack_state['last_modified'] if pack_state else None
+        db_hash = pack_state['content_hash'] if pack_state else None
+    else:
+        pack_node = FeaturePackNode.nodes.get_or_none(name=pack_name)
+        pack_state = pack_node
+        db_mtime = pack_node.last_modified if pack_node else None
+        db_hash = pack_node.content_hash if pack_node else None
     
-    if not pack_node:
+    if not pack_state:
         # Pack doesn't exist in DB, needs sync
         return True
+
+    if content_hash and db_hash:
+        return content_hash != db_hash
     
     # Check if filesystem is newer than DB (use UTC timezone)
     fs_mtime = datetime.fromtimestamp(os.path.getmtime(pack_path), tz=timezone.utc)
     
-    if pack_node.last_modified is None:
+    if db_mtime is None:
         return True
     
     # Ensure both datetimes are timezone-aware for comparison
-    db_mtime = pack_node.last_modified
     if db_mtime.tzinfo is None:
         # If DB time is naive, make it UTC-aware for comparison
         db_mtime = db_mtime.replace(tzinfo=timezone.utc)
@@ -6,7 +6,6 @@ urlpatterns = []
 
 
 def refresh_feature_pack_urls():
-    global urlpatterns
     new_patterns = []
     for item in getattr(settings, 'FEATURE_PACK_URLS', []):
         module = item.get('module') if isinstance(item, dict) else None
@@ -26,7 +25,8 @@ def refresh_feature_pack_urls():
 
         new_patterns.append(path(prefix, include(urls_module.urlpatterns)))
 
-    urlpatterns = new_patterns
+    # Updated in place: the include() resolver in cmdb.urls caches this list object
+    urlpatterns[:] = new_patterns
     clear_url_caches()
 
 
@@ -50,7 +50,7 @@ from django.conf import settings
 from cmdb.feature_pack_models import FeaturePackNode
 from cmdb.registry import TypeRegistry
 from core.apps import reload_feature_packs
-import json
+import orjson
 import importlib.util
 import os
 import shutil
@@ -83,8 +83,8 @@ def load_pack_types_from_path(pack_path):
     types_path = os.path.join(pack_path, 'types.json')
     if not os.path.exists(types_path):
         return {}
-    with open(types_path, 'r') as handle:
-        return json.load(handle)
+    with open(types_path, 'rb') as handle:
+        return orjson.loads(handle.read())
 
 
 def get_feature_packs_dir():
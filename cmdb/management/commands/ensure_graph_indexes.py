@@ -0,0 +1,11 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Create GraphDB property indexes and run pending property backfills for all node types."
+
+    def handle(self, *args, **options):
+        if not apps.get_app_config('core').ensure_indexes():
+            raise CommandError("Could not ensure property indexes; is GraphDB reachable?")
+        self.stdout.write(self.style.SUCCESS("Property indexes ensured"))
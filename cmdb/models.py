@@ -1,26 +1,199 @@
 # cmdb/models.py
+import json
 import re  # Used for label validation in get_or_create_label()
-from neomodel import StructuredNode, JSONProperty, config, db
+from datetime import datetime, timezone
+from neomodel import StructuredNode, JSONProperty, StringProperty, DateTimeProperty, config, db
 from django.conf import settings
+from .registry import TypeRegistry
 
 config.DATABASE_URL = settings.NEO4J_BOLT_URL
 
 # Module-level registry (global, shared across all calls)
 _LABEL_REGISTRY = {}
 
+# Valid Neo4j labels / property keys, and relationship types
+_IDENTIFIER_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+_REL_TYPE_RE = re.compile(r'^[A-Z_][A-Z0-9_]*$')
+
+# Attribute names that cannot be used for mirrored custom properties
+_RESERVED_PROPERTY_NAMES = frozenset({'id', 'element_id', 'deleted', 'custom_properties', 'name', 'updated_at'})
+
+
+def _declared_properties(label_name: str, metadata_key: str):
+    """
+    Return the custom property keys a type lists under metadata_key,
+    filtered to names that are safe to use as node attributes.
+    """
+    declared = TypeRegistry.get_metadata(label_name).get(metadata_key) or []
+    return tuple(
+        key for key in declared
+        if isinstance(key, str)
+        and _IDENTIFIER_RE.match(key)
+        and key not in _RESERVED_PROPERTY_NAMES
+    )
+
+
+def get_indexed_properties(label_name: str):
+    """Return the keys a type declares in 'indexed_properties' (mirrored and indexed)."""
+    return _declared_properties(label_name, 'indexed_properties')
+
+
+def get_mirrored_properties(label_name: str):
+    """
+    Return every key mirrored to a top-level property for a type: its
+    'indexed_properties' followed by its 'native_properties' (mirrored so
+    queries can read them without parsing custom_properties, but not indexed).
+    """
+    indexed = get_indexed_properties(label_name)
+    native = _declared_properties(label_name, 'native_properties')
+    return indexed + tuple(key for key in dict.fromkeys(native) if key not in indexed)
+
+
+def get_composite_indexes(label_name: str):
+    """
+    Return the composite indexes a type declares in 'composite_indexes', as
+    tuples of keys. Only keys that are mirrored to top-level properties count.
+    """
+    mirrored = set(('name',) + get_mirrored_properties(label_name))
+    declared = TypeRegistry.get_metadata(label_name).get('composite_indexes') or []
+    return [
+        tuple(keys) for keys in declared
+        if isinstance(keys, (list, tuple)) and len(keys) > 1
+        and all(key in mirrored for key in keys)
+    ]
+
+
+# Related node fields for relationship rows: the indexed top-level name, and
+# custom_properties parsed only for nodes that have no name (for the fallback).
+_RELATED_FIELDS = """
+    type(r), elementId(m), labels(m)[0], m.name,
+    CASE WHEN m.name IS NULL THEN apoc.convert.fromJsonMap(m.custom_properties) END
+"""
+
+# Both relationship directions of node n as [rel_type, element_id, label, name,
+# props] rows. Pattern comprehensions keep the directions independent, so the
+# query returns one row instead of |outgoing| x |incoming| rows.
+_RELATIONSHIP_PROJECTION = f"""
+    [(n)-[r]->(m) | [{_RELATED_FIELDS}]] AS outgoing,
+    [(m)-[r]->(n) | [{_RELATED_FIELDS}]] AS incoming
+"""
+
+
+# Node lookups by element ID. The label is a parameter rather than part of the
+# pattern: the element ID seek does the work, and one query text (and so one
+# cached plan) serves every label.
+_NODE_BY_ID_QUERY = """
+    MATCH (n) WHERE elementId(n) = $eid AND $label IN labels(n)
+    RETURN n
+"""
+
+_NODE_WITH_RELATIONSHIPS_QUERY = f"""
+    MATCH (n) WHERE elementId(n) = $eid AND $label IN labels(n)
+    RETURN n, {_RELATIONSHIP_PROJECTION}
+"""
+
+_RELATIONSHIPS_QUERY = f"""
+    MATCH (n) WHERE elementId(n) = $eid AND $label IN labels(n)
+    RETURN {_RELATIONSHIP_PROJECTION}
+"""
+
+# Relationships for a batch of nodes (e.g. one table page), one row per node
+_BULK_RELATIONSHIPS_QUERY = f"""
+    UNWIND $eids AS eid
+    MATCH (n) WHERE elementId(n) = eid AND $label IN labels(n)
+    RETURN eid, {_RELATIONSHIP_PROJECTION}
+"""
+
+_OUTGOING_RELATIONSHIPS_QUERY = f"""
+    MATCH (n) WHERE elementId(n) = $eid AND $label IN labels(n)
+    MATCH (n)-[r]->(m)
+    RETURN {_RELATED_FIELDS}
+"""
+
+_INCOMING_RELATIONSHIPS_QUERY = f"""
+    MATCH (n) WHERE elementId(n) = $eid AND $label IN labels(n)
+    MATCH (m)-[r]->(n)
+    RETURN {_RELATED_FIELDS}
+"""
+
+_DISCONNECT_QUERY = """
+    MATCH (source) WHERE elementId(source) = $sid AND $source_label IN labels(source)
+    MATCH (source)-[r]->(target)
+    WHERE type(r) = $rel_type AND elementId(target) = $tid AND $target_label IN labels(target)
+    DELETE r
+    SET source.updated_at = timestamp() / 1000.0, target.updated_at = timestamp() / 1000.0
+    RETURN count(r) AS deleted
+"""
+
+
+def _related_name(name, props_map):
+    """Name shown for a related node: its name, else its first custom property."""
+    if name is not None:
+        return name
+    if not props_map:
+        return None
+    name = props_map.get('name')
+    return name if name is not None else props_map[next(iter(props_map))]
+
+
+def _group_relationships(rows, prefix: str):
+    """
+    Group [rel_type, element_id, label, name, props_map] rows by relationship type
+    into the {rel_type: [{'<prefix>_id', '<prefix>_label', '<prefix>_name'}]} shape.
+    """
+    relationships = {}
+    for rel_type, related_id, related_label, name, props_map in rows:
+        relationships.setdefault(rel_type, []).append({
+            f'{prefix}_id': related_id,
+            f'{prefix}_label': related_label,
+            f'{prefix}_name': _related_name(name, props_map) or related_id[:50] + '...',
+        })
+    return relationships
+
+
+def _mirror_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
 class DynamicNode(StructuredNode):
     __abstract_node__ = True
     custom_properties = JSONProperty(default=dict)
+    # Top-level copy of custom_properties['name'] so name lookups can use an index
+    name = StringProperty()
+    # Last time the node or its relationships changed; part of cached tab context keys
+    updated_at = DateTimeProperty()
+    # Further custom property keys mirrored to top-level properties, per label
+    __mirrored_properties__ = ()
+    # TypeRegistry.version the mirrored properties were last checked against
+    __registry_version__ = None
+
+    def pre_save(self):
+        self.updated_at = datetime.now(timezone.utc)
+        for key in ('name',) + self.__mirrored_properties__:
+            setattr(self, key, _mirror_value(self.get_property(key)))
 
     @classmethod
     def get_or_create_label(cls, label_name: str):
-        if label_name in _LABEL_REGISTRY:
-            return _LABEL_REGISTRY[label_name]
+        existing = _LABEL_REGISTRY.get(label_name)
+        registry_version = TypeRegistry.version
+        # Fast path: no type has been (re)registered since this class was checked
+        if existing is not None and existing.__registry_version__ == registry_version:
+            return existing
+
+        mirrored_properties = get_mirrored_properties(label_name)
+        # Rebuild the class only if the type's mirrored properties changed
+        if existing is not None and existing.__mirrored_properties__ == mirrored_properties:
+            existing.__registry_version__ = registry_version
+            return existing
 
         # Validate label name follows Neo4j conventions
         # Must start with letter/underscore, followed by alphanumeric/underscore
         # This prevents potential injection and ensures valid Neo4j labels
-        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', label_name):
+        if not _IDENTIFIER_RE.match(label_name):
             raise ValueError(
                 f"Invalid label name: {label_name}. "
                 "Must start with a letter or underscore, followed by alphanumeric characters or underscores."
@@ -31,7 +204,15 @@ class DynamicNode(StructuredNode):
         attrs = {
             '__label__': label_name,
             '__module__': cls.__module__,
+            '__mirrored_properties__': mirrored_properties,
+            '__registry_version__': registry_version,
         }
+        for key in mirrored_properties:
+            attrs[key] = StringProperty()
+
+        if existing is not None:
+            # Drop the stale class from neomodel's label registry before redefining it
+            db._NODE_CLASS_REGISTRY.pop(frozenset(existing.inherited_labels()), None)
 
         new_class = type(class_name, (cls,), attrs)
 
@@ -45,34 +226,116 @@ class DynamicNode(StructuredNode):
         """
         return (self.custom_properties or {}).get(key, default)
     
+    @classmethod
+    def get_display_options(cls, limit: int = 200):
+        """
+        Return up to limit nodes of this label as plain dicts holding only the
+        fields used to label them in a select (element_id plus the name,
+        address and primary_ns custom properties), without inflating nodes.
+        """
+        query = f"""
+            MATCH (n:`{cls.__label__}`)
+            WITH n LIMIT $limit
+            WITH n, apoc.convert.fromJsonMap(n.custom_properties) AS props
+            RETURN elementId(n), coalesce(n.name, props.name), props.address, props.primary_ns
+        """
+        result, _ = db.cypher_query(query, {'limit': limit})
+        return [
+            {
+                'element_id': element_id,
+                'custom_properties': {'name': name, 'address': address, 'primary_ns': primary_ns},
+            }
+            for element_id, name, address, primary_ns in result
+        ]
+
     @classmethod
     def get_by_element_id(cls, element_id: str):
         """
         Retrieve a node by its Neo4j element ID.
         Returns the inflated node or None if not found.
         
-        Note: The label is safely obtained from cls.__label__ which is set
-        during class creation via get_or_create_label() and comes from
-        TypeRegistry (application-controlled, not user input).
+        Note: The label comes from cls.__label__, set during class creation
+        via get_or_create_label(), and is passed as a query parameter.
         """
         # Validate label exists (defensive check)
         if not hasattr(cls, '__label__') or not cls.__label__:
             raise ValueError("Class must have a valid __label__ attribute")
         
-        # Label is parameterized as part of the node pattern for Neo4j
-        # Element ID is properly parameterized to prevent injection
-        query = f"""
-            MATCH (n:`{cls.__label__}`)
-            WHERE elementId(n) = $eid
-            RETURN n
-        """
-        result, _ = db.cypher_query(query, {'eid': element_id})
+        # Label and element ID are both parameters, so every label shares one plan
+        result, _ = db.cypher_query(_NODE_BY_ID_QUERY, {'eid': element_id, 'label': cls.__label__})
         if not result:
             return None
         
         raw_node = result[0][0]
         return cls.inflate(raw_node)
     
+    @classmethod
+    def get_with_relationships(cls, element_id: str):
+        """
+        Retrieve a node and its outgoing and incoming relationships in one query.
+        
+        Returns:
+            Tuple of (node, outgoing, incoming) where outgoing and incoming have the
+            same shape as get_outgoing_relationships() / get_incoming_relationships(),
+            or (None, {}, {}) if the node does not exist
+        """
+        if not hasattr(cls, '__label__') or not cls.__label__:
+            raise ValueError("Class must have a valid __label__ attribute")
+        
+        result, _ = db.cypher_query(
+            _NODE_WITH_RELATIONSHIPS_QUERY, {'eid': element_id, 'label': cls.__label__}
+        )
+        if not result:
+            return None, {}, {}
+        
+        raw_node, outgoing, incoming = result[0]
+        return (
+            cls.inflate(raw_node),
+            _group_relationships(outgoing, 'target'),
+            _group_relationships(incoming, 'source'),
+        )
+    
+    def get_relationships(self):
+        """
+        Get outgoing and incoming relationships of this node in one query.
+        
+        Returns:
+            Tuple of (outgoing, incoming) in the shapes returned by
+            get_outgoing_relationships() and get_incoming_relationships()
+        """
+        if not hasattr(self, '__label__'):
+            raise ValueError("Node must have a __label__ attribute")
+        
+        result, _ = db.cypher_query(
+            _RELATIONSHIPS_QUERY, {'eid': self.element_id, 'label': self.__label__}
+        )
+        if not result:
+            return {}, {}
+        
+        outgoing, incoming = result[0]
+        return _group_relationships(outgoing, 'target'), _group_relationships(incoming, 'source')
+    
+    @classmethod
+    def get_relationships_bulk(cls, element_ids):
+        """
+        Get outgoing and incoming relationships for several nodes of this label
+        in one query.
+
+        Returns:
+            Dict mapping element ID to an (outgoing, incoming) tuple as returned
+            by get_relationships(); IDs that were not found are omitted.
+        """
+        if not element_ids:
+            return {}
+
+        result, _ = db.cypher_query(
+            _BULK_RELATIONSHIPS_QUERY, {'eids': list(element_ids), 'label': cls.__label__}
+        )
+        return {
+            element_id: (_group_relationships(outgoing, 'target'), _group_relationships(incoming, 'source'))
+            for element_id, outgoing, incoming in result
+        }
+
     def get_outgoing_relationships(self):
         """
         Get all outgoing relationships from this node.
@@ -81,42 +344,16 @@ class DynamicNode(StructuredNode):
         Each related node info contains:
         - target_id: Neo4j element ID
         - target_label: Node label
-        - target_name: Name extracted from custom_properties (or fallback)
+        - target_name: Node name (or fallback)
         """
         if not hasattr(self, '__label__'):
             raise ValueError("Node must have a __label__ attribute")
         
-        query = f"""
-            MATCH (n:`{self.__label__}`) WHERE elementId(n) = $eid
-            MATCH (n)-[r]->(m)
-            WITH 
-                type(r) AS rel_type,
-                elementId(m) AS target_id,
-                labels(m)[0] AS target_label,
-                apoc.convert.fromJsonMap(m.custom_properties) AS props_map
-            RETURN 
-                rel_type,
-                target_id,
-                target_label,
-                COALESCE(
-                    props_map.name,
-                    props_map[head(keys(props_map))]
-                ) AS target_name
-        """
-        result, _ = db.cypher_query(query, {'eid': self.element_id})
-        
-        relationships = {}
-        for row in result:
-            rel_type = row[0]
-            if rel_type not in relationships:
-                relationships[rel_type] = []
-            relationships[rel_type].append({
-                'target_id': row[1],
-                'target_label': row[2],
-                'target_name': row[3] or row[1][:50] + '...',
-            })
-        
-        return relationships
+        result, _ = db.cypher_query(
+            _OUTGOING_RELATIONSHIPS_QUERY, {'eid': self.element_id, 'label': self.__label__}
+        )
+        
+        return _group_relationships(result, 'target')
     
     def get_incoming_relationships(self):
         """
@@ -126,42 +363,16 @@ class DynamicNode(StructuredNode):
         Each related node info contains:
         - source_id: Neo4j element ID
         - source_label: Node label
-        - source_name: Name extracted from custom_properties (or fallback)
+        - source_name: Node name (or fallback)
         """
         if not hasattr(self, '__label__'):
             raise ValueError("Node must have a __label__ attribute")
         
-        query = f"""
-            MATCH (n:`{self.__label__}`) WHERE elementId(n) = $eid
-            MATCH (m)-[r]->(n)
-            WITH 
-                type(r) AS rel_type,
-                elementId(m) AS source_id,
-                labels(m)[0] AS source_label,
-                apoc.convert.fromJsonMap(m.custom_properties) AS props_map
-            RETURN 
-                rel_type,
-                source_id,
-                source_label,
-                COALESCE(
-                    props_map.name,
-                    props_map[head(keys(props_map))]
-                ) AS source_name
-        """
-        result, _ = db.cypher_query(query, {'eid': self.element_id})
-        
-        relationships = {}
-        for row in result:
-            rel_type = row[0]
-            if rel_type not in relationships:
-                relationships[rel_type] = []
-            relationships[rel_type].append({
-                'source_id': row[1],
-                'source_label': row[2],
-                'source_name': row[3] or row[1][:50] + '...',
-            })
-        
-        return relationships
+        result, _ = db.cypher_query(
+            _INCOMING_RELATIONSHIPS_QUERY, {'eid': self.element_id, 'label': self.__label__}
+        )
+        
+        return _group_relationships(result, 'source')
     
     @classmethod
     def connect_nodes(cls, source_element_id: str, source_label: str, 
@@ -180,21 +391,61 @@ class DynamicNode(StructuredNode):
             True if successful, False otherwise
         """
         # Validate relationship type follows Neo4j conventions
-        if not re.match(r'^[A-Z_][A-Z0-9_]*$', rel_type):
+        if not _REL_TYPE_RE.match(rel_type):
             raise ValueError(
                 f"Invalid relationship type: {rel_type}. "
                 "Must be uppercase with underscores."
             )
         
+        # Relationship types cannot be parameters in MERGE; it was validated above
         query = f"""
-            MATCH (source:`{source_label}`) WHERE elementId(source) = $sid
-            MATCH (target:`{target_label}`) WHERE elementId(target) = $tid
+            MATCH (source) WHERE elementId(source) = $sid AND $source_label IN labels(source)
+            MATCH (target) WHERE elementId(target) = $tid AND $target_label IN labels(target)
             MERGE (source)-[:`{rel_type}`]->(target)
+            SET source.updated_at = timestamp() / 1000.0, target.updated_at = timestamp() / 1000.0
             RETURN elementId(source) AS source_id
         """
-        result, _ = db.cypher_query(query, {'sid': source_element_id, 'tid': target_element_id})
+        result, _ = db.cypher_query(query, {
+            'sid': source_element_id, 'source_label': source_label,
+            'tid': target_element_id, 'target_label': target_label,
+        })
         return bool(result)
     
+    @classmethod
+    def connect_nodes_bulk(cls, source_label: str, rel_type: str, target_label: str, pairs):
+        """
+        Create many relationships of a single type in one query.
+        
+        Args:
+            source_label: Label of the source nodes
+            rel_type: Type of relationship to create
+            target_label: Label of the target nodes
+            pairs: Iterable of (source_element_id, target_element_id) tuples
+            
+        Returns:
+            Number of source/target pairs that were matched and connected
+        """
+        if not _REL_TYPE_RE.match(rel_type):
+            raise ValueError(
+                f"Invalid relationship type: {rel_type}. "
+                "Must be uppercase with underscores."
+            )
+        
+        query = f"""
+            UNWIND $pairs AS pair
+            MATCH (source) WHERE elementId(source) = pair[0] AND $source_label IN labels(source)
+            MATCH (target) WHERE elementId(target) = pair[1] AND $target_label IN labels(target)
+            MERGE (source)-[:`{rel_type}`]->(target)
+            SET source.updated_at = timestamp() / 1000.0, target.updated_at = timestamp() / 1000.0
+            RETURN count(*) AS connected
+        """
+        result, _ = db.cypher_query(query, {
+            'pairs': [list(pair) for pair in pairs],
+            'source_label': source_label,
+            'target_label': target_label,
+        })
+        return result[0][0] if result else 0
+    
     @classmethod
     def disconnect_nodes(cls, source_element_id: str, source_label: str,
                         rel_type: str, target_element_id: str, target_label: str):
@@ -211,11 +462,55 @@ class DynamicNode(StructuredNode):
         Returns:
             Number of relationships deleted (0 or 1)
         """
-        query = f"""
-            MATCH (source:`{source_label}`)-[r:`{rel_type}`]->(target:`{target_label}`)
-            WHERE elementId(source) = $sid AND elementId(target) = $tid
-            DELETE r
-            RETURN count(r) AS deleted
-        """
-        result, _ = db.cypher_query(query, {'sid': source_element_id, 'tid': target_element_id})
-        return result[0][0] if result else 0
\ No newline at end of file
+        result, _ = db.cypher_query(_DISCONNECT_QUERY, {
+            'sid': source_element_id, 'source_label': source_label,
+            'tid': target_element_id, 'target_label': target_label,
+            'rel_type': rel_type,
+        })
+        return result[0][0] if result else 0
+
+
+# Marker nodes recording which (label, key) backfills have already run
+_BACKFILL_MARKER_LABEL = 'CMDBPropertyBackfill'
+
+
+def ensure_property_indexes(labels):
+    """
+    Create an index on the top-level name property, on each of the type's
+    indexed_properties and for each of its composite_indexes, for each label.
+    Backfill the top-level copies of all mirrored properties from
+    custom_properties for nodes saved before the properties existed.
+
+    Each backfill scans every node of the label, so it runs once per label
+    and key: completed backfills are recorded on marker nodes, and nodes
+    saved afterwards are mirrored by pre_save().
+    """
+    result, _ = db.cypher_query(f"MATCH (b:`{_BACKFILL_MARKER_LABEL}`) RETURN b.label, b.key")
+    backfilled = {(label, key) for label, key in result}
+    for label in labels:
+        if not _IDENTIFIER_RE.match(label):
+            continue
+        for key in ('name',) + get_indexed_properties(label):
+            db.cypher_query(f"CREATE INDEX IF NOT EXISTS FOR (n:`{label}`) ON (n.`{key}`)")
+        for keys in get_composite_indexes(label):
+            columns = ', '.join(f"n.`{key}`" for key in keys)
+            db.cypher_query(f"CREATE INDEX IF NOT EXISTS FOR (n:`{label}`) ON ({columns})")
+        for key in ('name',) + get_mirrored_properties(label):
+            if (label, key) in backfilled:
+                continue
+            db.cypher_query(f"""
+                MATCH (n:`{label}`)
+                WHERE n.`{key}` IS NULL AND n.custom_properties IS NOT NULL
+                WITH n, apoc.convert.fromJsonMap(n.custom_properties)[$key] AS value
+                WHERE value IS NOT NULL
+                SET n.`{key}` = CASE
+                    WHEN apoc.meta.cypher.type(value) STARTS WITH 'MAP'
+                      OR apoc.meta.cypher.type(value) STARTS WITH 'LIST'
+                    THEN apoc.convert.toJson(value)
+                    ELSE toString(value)
+                END
+            """, {'key': key})
+            db.cypher_query(
+                f"MERGE (:`{_BACKFILL_MARKER_LABEL}` {{label: $label, key: $key}})",
+                {'label': label, 'key': key},
+            )
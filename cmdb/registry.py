@@ -1,14 +1,26 @@
 # cmdb/registry.py
 from typing import Dict, Any, List, Optional
+import hashlib
+import json
 
 class TypeRegistry:
     _types: Dict[str, Dict[str, Any]] = {}
     _pack_mapping: Dict[str, str] = {}  # Maps type label to pack name
+    _registered: Dict[str, str] = {}  # Maps type label to a hash of its registered metadata
+    version = 0  # Bumped whenever the registered types change
 
     @classmethod
     def register(cls, label: str, metadata: Dict[str, Any], pack_name: Optional[str] = None):
         """Register a type with its metadata and optionally track which pack it came from."""
+        metadata_hash = hashlib.sha1(
+            json.dumps(metadata, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        if (cls._registered.get(label) == metadata_hash and label in cls._types
+                and (not pack_name or cls._pack_mapping.get(label) == pack_name)):
+            return
+        cls._registered[label] = metadata_hash
         cls._types[label] = metadata
+        cls.version += 1
         if pack_name:
             cls._pack_mapping[label] = pack_name
 
@@ -57,11 +69,21 @@ class TypeRegistry:
     def unregister(cls, label: str):
         cls._types.pop(label, None)
         cls._pack_mapping.pop(label, None)
+        cls._registered.pop(label, None)
+        cls.version += 1
+
+    @classmethod
+    def retain(cls, labels):
+        """Unregister every type whose label is not in labels."""
+        for label in set(cls._types) - set(labels):
+            cls.unregister(label)
 
     @classmethod
     def clear(cls):
         cls._types.clear()
         cls._pack_mapping.clear()
+        cls._registered.clear()
+        cls.version += 1
 
 
 registry = TypeRegistry()
@@ -0,0 +1,50 @@
+"""
+Tests for audit hook dispatch.
+"""
+from django.test import SimpleTestCase, override_settings
+from cmdb import audit_hooks
+
+
+class EmitAuditTest(SimpleTestCase):
+    """Test that emit_audit delivers events to registered hooks."""
+
+    def setUp(self):
+        """Register a recording hook."""
+        self.events = []
+        self.hook = lambda **kwargs: self.events.append(kwargs)
+        audit_hooks.register_audit_hook(self.hook)
+
+    def tearDown(self):
+        """Clean up."""
+        audit_hooks.flush_audit()
+        audit_hooks._audit_hooks.remove(self.hook)
+
+    def test_async_events_are_delivered_after_flush(self):
+        """Queued events reach the hook once the queue is flushed."""
+        audit_hooks.emit_audit(action='create', node_id='4:abc')
+
+        self.assertTrue(audit_hooks.flush_audit())
+        self.assertEqual(self.events, [{'action': 'create', 'node_id': '4:abc'}])
+
+    @override_settings(AUDIT_HOOKS_ASYNC=False)
+    def test_sync_events_are_delivered_immediately(self):
+        """With AUDIT_HOOKS_ASYNC disabled the hook runs before emit_audit returns."""
+        audit_hooks.emit_audit(action='delete', node_id='4:abc')
+
+        self.assertEqual(self.events, [{'action': 'delete', 'node_id': '4:abc'}])
+
+    @override_settings(AUDIT_HOOKS_ASYNC=False)
+    def test_failing_hook_is_logged_and_others_still_run(self):
+        """A hook that raises is logged with its traceback and does not stop later hooks."""
+        def failing_hook(**kwargs):
+            raise RuntimeError('audit store unavailable')
+
+        audit_hooks._audit_hooks.insert(0, failing_hook)
+        self.addCleanup(audit_hooks._audit_hooks.remove, failing_hook)
+
+        with self.assertLogs('cmdb.audit_hooks', level='ERROR') as logs:
+            audit_hooks.emit_audit(action='update', node_id='4:abc')
+
+        self.assertIn('Audit hook failed', logs.output[0])
+        self.assertIs(logs.records[0].exc_info[0], RuntimeError)
+        self.assertEqual(self.events, [{'action': 'update', 'node_id': '4:abc'}])
@@ -0,0 +1,167 @@
+"""
+Tests for deciding which feature packs to sync and writing them to GraphDB.
+"""
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from cmdb.feature_pack_models import (
+    FeaturePackNode,
+    should_sync_pack,
+    sync_feature_pack_to_db,
+    sync_feature_packs_to_db_bulk,
+)
+from core.apps import _read_pack_sources
+
+
+class GetPackStatesTest(SimpleTestCase):
+    """Test the single query that reads every pack's enabled flag and sync state."""
+
+    def test_rows_are_keyed_by_pack_name(self):
+        """Timestamps become UTC datetimes and enabled is always a bool."""
+        rows = [
+            ['network_pack', True, 1700000000.0, 'abc'],
+            ['legacy_pack', None, None, None],
+        ]
+        with patch('cmdb.feature_pack_models.db') as db:
+            db.cypher_query.return_value = (rows, None)
+            states = FeaturePackNode.get_pack_states()
+
+        db.cypher_query.assert_called_once()
+        self.assertEqual(states['network_pack'], {
+            'enabled': True,
+            'content_hash': 'abc',
+            'last_modified': datetime.fromtimestamp(1700000000.0, tz=timezone.utc),
+        })
+        self.assertEqual(states['legacy_pack'], {
+            'enabled': False,
+            'content_hash': None,
+            'last_modified': None,
+        })
+
+
+class ShouldSyncPackTest(SimpleTestCase):
+    """Test the sync decision made from the batched pack states."""
+
+    def setUp(self):
+        self.pack_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pack_path, ignore_errors=True)
+
+    def states(self, content_hash):
+        return {'network_pack': {'enabled': True, 'content_hash': content_hash, 'last_modified': None}}
+
+    def test_matching_hash_does_not_sync(self):
+        """A pack whose stored hash matches the files on disk is left alone."""
+        self.assertFalse(should_sync_pack('network_pack', self.pack_path, self.states('abc'), 'abc'))
+
+    def test_different_hash_syncs(self):
+        """A changed hash means the pack files were edited."""
+        self.assertTrue(should_sync_pack('network_pack', self.pack_path, self.states('abc'), 'def'))
+
+    def test_missing_stored_hash_syncs(self):
+        """A pack synced before hashes were stored, with no mtime either, is synced."""
+        self.assertTrue(should_sync_pack('network_pack', self.pack_path, self.states(None), 'abc'))
+
+    def test_pack_missing_from_states_syncs(self):
+        """A pack not yet in GraphDB is synced."""
+        self.assertTrue(should_sync_pack('network_pack', self.pack_path, {}, 'abc'))
+
+    def test_without_states_falls_back_to_pack_lookup(self):
+        """pack_states=None reads the single pack node instead."""
+        pack_node = SimpleNamespace(last_modified=None, content_hash='abc')
+        # NodeSet has async counterparts, so patch() would otherwise build an AsyncMock
+        with patch('cmdb.feature_pack_models.FeaturePackNode.nodes', new=MagicMock()) as nodes:
+            nodes.get_or_none.return_value = pack_node
+            self.assertFalse(should_sync_pack('network_pack', self.pack_path, None, 'abc'))
+
+        nodes.get_or_none.assert_called_once_with(name='network_pack')
+
+
+class SyncFeaturePackTest(SimpleTestCase):
+    """Test the single-pack sync used by the install and upgrade views."""
+
+    def setUp(self):
+        self.pack_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pack_path, ignore_errors=True)
+        with open(os.path.join(self.pack_path, 'types.json'), 'w', encoding='utf-8') as handle:
+            handle.write('{"Switch": {}}')
+
+        patcher = patch('cmdb.feature_pack_models.FeaturePackNode.get_or_create_pack')
+        self.get_or_create_pack = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_content_hash_is_read_from_the_pack_when_not_given(self):
+        """Installed and upgraded packs store the same hash the startup loader compares."""
+        sync_feature_pack_to_db('network_pack', self.pack_path, types_data={'Switch': {}})
+
+        stored_hash = self.get_or_create_pack.call_args.kwargs['content_hash']
+        self.assertEqual(stored_hash, _read_pack_sources(self.pack_path)[1])
+
+    def test_given_content_hash_is_stored(self):
+        """A hash the caller already computed is used as is."""
+        sync_feature_pack_to_db('network_pack', self.pack_path, content_hash='abc')
+
+        self.assertEqual(self.get_or_create_pack.call_args.kwargs['content_hash'], 'abc')
+
+
+class SyncFeaturePacksBulkTest(SimpleTestCase):
+    """Test the rows sent by the single bulk sync query."""
+
+    def setUp(self):
+        self.pack_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pack_path, ignore_errors=True)
+
+        db_patcher = patch('cmdb.feature_pack_models.db')
+        self.db = db_patcher.start()
+        self.addCleanup(db_patcher.stop)
+
+    def test_no_packs_skips_query(self):
+        """Nothing is sent when there is nothing to sync."""
+        self.assertEqual(sync_feature_packs_to_db_bulk([]), 0)
+        self.db.cypher_query.assert_not_called()
+
+    def test_packs_are_sent_as_one_unwind_query(self):
+        """Every pack becomes one row with its name and node properties."""
+        written = sync_feature_packs_to_db_bulk([
+            {
+                'pack_name': 'network_pack',
+                'pack_path': self.pack_path,
+                'config': {'name': 'Network', 'version': '2.1'},
+                'types_data': {'Switch': {}, 'Router': {}},
+                'content_hash': 'abc',
+            },
+            {
+                'pack_name': 'bare_pack',
+                'pack_path': self.pack_path,
+                'config': None,
+                'types_data': None,
+                'content_hash': None,
+            },
+        ])
+
+        self.assertEqual(written, 2)
+        self.db.cypher_query.assert_called_once()
+        query, params = self.db.cypher_query.call_args.args
+        self.assertIn('UNWIND $packs', query)
+        network, bare = params['packs']
+
+        self.assertEqual(network['name'], 'network_pack')
+        props = network['props']
+        self.assertEqual(props['display_name'], 'Network')
+        self.assertEqual(props['path'], self.pack_path)
+        self.assertEqual(props['last_modified'], os.path.getmtime(self.pack_path))
+        self.assertEqual(props['version'], '2.1')
+        self.assertEqual(props['content_hash'], 'abc')
+        self.assertEqual(json.loads(props['types']), ['Switch', 'Router'])
+        self.assertEqual(json.loads(props['config']), {'name': 'Network', 'version': '2.1'})
+        self.assertNotIn('enabled', props)
+
+        self.assertEqual(bare['props']['display_name'], 'bare_pack')
+        self.assertEqual(bare['props']['version'], '0.0.0')
+        self.assertEqual(json.loads(bare['props']['types']), [])
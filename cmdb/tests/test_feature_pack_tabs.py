@@ -0,0 +1,55 @@
+"""
+Tests for caching feature pack tab contexts.
+"""
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from cmdb.views import _feature_pack_tab_context
+
+VIEW_CALLS = []
+
+
+def plain_tab_view(request, label, element_id):
+    VIEW_CALLS.append(element_id)
+    return {'rack_units': [1, 2, 3]}
+
+
+def unpicklable_tab_view(request, label, element_id):
+    VIEW_CALLS.append(element_id)
+    return {'render': lambda: element_id}
+
+
+class FeaturePackTabContextTest(SimpleTestCase):
+    """Test that tab contexts with a cache_timeout are cached only when they can be pickled."""
+
+    def setUp(self):
+        cache.clear()
+        VIEW_CALLS.clear()
+        self.request = SimpleNamespace(user=SimpleNamespace(pk=1))
+        self.node = SimpleNamespace(updated_at=None)
+
+    def tab_context(self, view_name):
+        tab = {
+            'id': view_name,
+            'custom_view': f'cmdb.tests.test_feature_pack_tabs.{view_name}',
+            'cache_timeout': 60,
+        }
+        return _feature_pack_tab_context(self.request, tab, 'Device', '4:1', self.node)
+
+    def test_plain_context_is_cached(self):
+        """A picklable context is built once and then served from the cache."""
+        first = self.tab_context('plain_tab_view')
+        second = self.tab_context('plain_tab_view')
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(VIEW_CALLS), 1)
+
+    def test_unpicklable_context_is_returned_uncached(self):
+        """A context the cache cannot pickle is still rendered, just rebuilt on each request."""
+        context = self.tab_context('unpicklable_tab_view')
+        self.tab_context('unpicklable_tab_view')
+
+        self.assertEqual(context['render'](), '4:1')
+        self.assertEqual(len(VIEW_CALLS), 2)
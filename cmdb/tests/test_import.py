@@ -0,0 +1,176 @@
+"""
+Tests for chunked node import.
+"""
+import itertools
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from cmdb.views import CSV_ROW_OFFSET, _create_import_relationships, _import_chunk
+
+
+class FakeNode:
+    """Stand-in for a DynamicNode class: save() assigns an element ID, or fails for 'bad' rows."""
+
+    _ids = itertools.count(1)
+    saved = []
+
+    def __init__(self, custom_properties=None):
+        self.custom_properties = custom_properties or {}
+        self.element_id = None
+
+    def save(self):
+        if self.custom_properties.get('name') == 'bad':
+            raise ValueError('constraint violated')
+        self.element_id = f"4:{next(self._ids)}"
+        FakeNode.saved.append(self.element_id)
+        return self
+
+
+class ImportChunkTestBase(SimpleTestCase):
+    """Patch the graph connection and audit dispatch used by the import."""
+
+    def setUp(self):
+        """Record audit events instead of running hooks."""
+        FakeNode.saved = []
+        self.request = MagicMock()
+        self.request.user.username = 'importer'
+        self.request.user.is_authenticated = True
+
+        db_patcher = patch('cmdb.views.db')
+        self.db = db_patcher.start()
+        self.addCleanup(db_patcher.stop)
+
+        audit_patcher = patch('cmdb.views.emit_audit')
+        self.emit_audit = audit_patcher.start()
+        self.addCleanup(audit_patcher.stop)
+
+    def import_rows(self, names, required=('name',), relationships=None, **columns):
+        df = pd.DataFrame({'name': names, **columns})
+        return _import_chunk(
+            self.request, 'Device', FakeNode, df, ['name'], list(required), relationships or {}
+        )
+
+
+class ImportChunkAuditTest(ImportChunkTestBase):
+    """Test that audit events are emitted only for committed rows."""
+
+    def test_clean_chunk_audits_each_row_after_commit(self):
+        """Every created node gets one create event."""
+        self.import_rows(['sw1', 'sw2'])
+
+        audited = [c.kwargs['node_id'] for c in self.emit_audit.call_args_list]
+        self.assertEqual(audited, FakeNode.saved)
+        self.assertTrue(all(c.kwargs['action'] == 'create' for c in self.emit_audit.call_args_list))
+
+    def test_failed_atomic_pass_audits_only_retried_rows_once(self):
+        """Rows from the rolled back pass are not audited; retried rows are, once each."""
+        created, _, errors = self.import_rows(['sw1', 'bad', 'sw2'])
+
+        # First pass saved sw1 before failing; the retry saved sw1 and sw2 again
+        rolled_back, committed = FakeNode.saved[:1], FakeNode.saved[1:]
+        audited = [c.kwargs['node_id'] for c in self.emit_audit.call_args_list]
+
+        self.assertEqual(created, 2)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(audited, committed)
+        self.assertNotIn(rolled_back[0], audited)
+
+
+class ImportChunkRetryTest(ImportChunkTestBase):
+    """Test the atomic pass and the row-by-row retry after it fails."""
+
+    def test_clean_chunk_takes_one_atomic_pass(self):
+        """Without errors every row is saved once, inside a single transaction."""
+        created, _, errors = self.import_rows(['sw1', 'sw2', 'sw3'])
+
+        self.assertEqual(self.db.transaction.__enter__.call_count, 1)
+        self.assertEqual(created, 3)
+        self.assertEqual(len(FakeNode.saved), 3)
+        self.assertEqual(errors, [])
+
+    def test_failing_row_is_reported_with_its_csv_row_number(self):
+        """The atomic pass raises, and the retry names the failing row as it appears in the file."""
+        _, _, errors = self.import_rows(['sw1', 'bad', 'sw2'])
+
+        self.assertEqual(errors, [f"Row {1 + CSV_ROW_OFFSET}: constraint violated"])
+
+    def test_retry_results_are_returned(self):
+        """Counts and queued relationships come from the retry, not the rolled back pass."""
+        created, relationship_queue, _ = self.import_rows(
+            ['sw1', 'bad', 'sw2'],
+            relationships={'OWNER': {'target': 'Person'}},
+            owner_names=['alice', 'bob', 'carol'],
+        )
+
+        committed = FakeNode.saved[1:]
+        self.assertEqual(created, 2)
+        self.assertEqual(relationship_queue, [
+            (committed[0], 'sw1', {'OWNER': 'alice'}),
+            (committed[1], 'sw2', {'OWNER': 'carol'}),
+        ])
+
+
+class ImportRelationshipsTest(ImportChunkTestBase):
+    """Test the batched relationship creation run after every chunk is imported."""
+
+    relationships = {'OWNER': {'target': 'Person'}}
+
+    def setUp(self):
+        """Resolve target names from a fixed set of Person nodes."""
+        super().setUp()
+        people = {'alice': '4:100', 'bob': '4:101'}
+        self.db.cypher_query.side_effect = lambda query, params: (
+            [[name, people[name]] for name in params['names'] if name in people], None
+        )
+        self.node_class = MagicMock()
+
+    def create(self, relationship_queue):
+        return _create_import_relationships('Device', self.node_class, self.relationships, relationship_queue)
+
+    def test_targets_are_resolved_once_per_label_and_connected_in_bulk(self):
+        """All names for a label go in one lookup and all pairs in one bulk call."""
+        errors = self.create([
+            ('4:1', 'sw1', {'OWNER': 'alice, bob'}),
+            ('4:2', 'sw2', {'OWNER': 'alice'}),
+        ])
+
+        self.assertEqual(errors, [])
+        self.db.cypher_query.assert_called_once()
+        query, params = self.db.cypher_query.call_args.args
+        self.assertIn('`Person`', query)
+        self.assertEqual(sorted(params['names']), ['alice', 'bob'])
+        self.node_class.connect_nodes_bulk.assert_called_once_with(
+            'Device', 'OWNER', 'Person', [('4:1', '4:100'), ('4:1', '4:101'), ('4:2', '4:100')]
+        )
+        self.node_class.connect_nodes.assert_not_called()
+
+    def test_unknown_targets_and_relationship_types_are_reported(self):
+        """Unresolved names and relationship types without metadata become errors."""
+        errors = self.create([
+            ('4:1', 'sw1', {'OWNER': 'carol'}),
+            ('4:2', 'sw2', {'LOCATED_IN': 'dc1'}),
+        ])
+
+        self.assertEqual(errors, [
+            "Node 'sw2': Unknown relationship type 'LOCATED_IN'",
+            "Node 'sw1': Target node 'carol' of type 'Person' not found for relationship 'OWNER'",
+        ])
+        self.node_class.connect_nodes_bulk.assert_not_called()
+
+    def test_failed_bulk_batch_falls_back_to_single_connects(self):
+        """A failing batch is retried pair by pair so only the bad pairs are reported."""
+        self.node_class.connect_nodes_bulk.side_effect = RuntimeError('deadlock')
+        self.node_class.connect_nodes.side_effect = [None, RuntimeError('constraint violated')]
+
+        errors = self.create([
+            ('4:1', 'sw1', {'OWNER': 'alice'}),
+            ('4:2', 'sw2', {'OWNER': 'bob'}),
+        ])
+
+        self.assertEqual(self.node_class.connect_nodes.call_count, 2)
+        self.node_class.connect_nodes.assert_any_call('4:1', 'Device', 'OWNER', '4:100', 'Person')
+        self.assertEqual(errors, [
+            "Node 'sw2': Failed to create relationship 'OWNER' to 'bob': constraint violated",
+        ])
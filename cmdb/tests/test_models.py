@@ -0,0 +1,122 @@
+"""
+Tests for DynamicNode property mirroring and relationship helpers.
+"""
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from cmdb.registry import TypeRegistry
+from cmdb.models import (
+    DynamicNode, _group_relationships, ensure_property_indexes, get_composite_indexes, get_indexed_properties,
+)
+
+
+class IndexedPropertiesTest(SimpleTestCase):
+    """Test mirroring of indexed custom properties to top-level node properties."""
+
+    def setUp(self):
+        """Register a type that declares indexed properties."""
+        TypeRegistry.register('TestAuditEntry', {
+            'display_name': 'Test Audit Entry',
+            'properties': ['node_id', 'timestamp'],
+            'indexed_properties': ['node_id', 'timestamp', 'custom_properties', 'not-valid'],
+        })
+
+    def tearDown(self):
+        """Clean up."""
+        TypeRegistry.unregister('TestAuditEntry')
+
+    def test_reserved_and_invalid_keys_are_ignored(self):
+        """Only safe attribute names are mirrored."""
+        self.assertEqual(get_indexed_properties('TestAuditEntry'), ('node_id', 'timestamp'))
+
+    def test_pre_save_mirrors_indexed_properties(self):
+        """pre_save copies name and indexed properties out of custom_properties."""
+        node_class = DynamicNode.get_or_create_label('TestAuditEntry')
+        node = node_class(custom_properties={'name': 'entry', 'node_id': '4:abc', 'timestamp': 5})
+        node.pre_save()
+
+        self.assertEqual(node.name, 'entry')
+        self.assertEqual(node.node_id, '4:abc')
+        self.assertEqual(node.timestamp, '5')
+
+    def test_class_is_rebuilt_when_indexed_properties_change(self):
+        """A changed type definition produces a class with the new properties."""
+        first = DynamicNode.get_or_create_label('TestAuditEntry')
+        self.assertIs(DynamicNode.get_or_create_label('TestAuditEntry'), first)
+
+        TypeRegistry.register('TestAuditEntry', {'indexed_properties': ['node_id']})
+        second = DynamicNode.get_or_create_label('TestAuditEntry')
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.__mirrored_properties__, ('node_id',))
+
+    def test_native_properties_are_mirrored_as_json_when_structured(self):
+        """native_properties are mirrored too, with dicts and lists stored as JSON."""
+        TypeRegistry.register('TestAuditEntry', {
+            'indexed_properties': ['node_id'],
+            'native_properties': ['node_id', 'changes'],
+        })
+        node_class = DynamicNode.get_or_create_label('TestAuditEntry')
+        self.assertEqual(node_class.__mirrored_properties__, ('node_id', 'changes'))
+
+        node = node_class(custom_properties={'node_id': '4:abc', 'changes': {'name': ['a', 'b']}})
+        node.pre_save()
+
+        self.assertEqual(node.changes, '{"name": ["a", "b"]}')
+
+    def test_composite_indexes_require_mirrored_keys(self):
+        """Composite indexes over keys that are not mirrored are ignored."""
+        TypeRegistry.register('TestAuditEntry', {
+            'indexed_properties': ['node_id', 'timestamp'],
+            'composite_indexes': [['node_id', 'timestamp'], ['node_id', 'action'], ['node_id']],
+        })
+
+        self.assertEqual(get_composite_indexes('TestAuditEntry'), [('node_id', 'timestamp')])
+
+
+    def test_backfills_run_once_per_label_and_key(self):
+        """Backfills already recorded by a marker node are skipped; new ones are recorded."""
+        def cypher_query(query, params=None):
+            if query.startswith('MATCH (b:'):
+                return [['TestAuditEntry', 'name']], None
+            return [], None
+
+        with patch('cmdb.models.db') as db:
+            db.cypher_query.side_effect = cypher_query
+            ensure_property_indexes(['TestAuditEntry'])
+
+        backfilled = [
+            c.args[1]['key'] for c in db.cypher_query.call_args_list
+            if 'apoc.convert.fromJsonMap' in c.args[0]
+        ]
+        recorded = [
+            c.args[1] for c in db.cypher_query.call_args_list
+            if c.args[0].startswith('MERGE')
+        ]
+        self.assertEqual(backfilled, ['node_id', 'timestamp'])
+        self.assertEqual(recorded, [
+            {'label': 'TestAuditEntry', 'key': 'node_id'},
+            {'label': 'TestAuditEntry', 'key': 'timestamp'},
+        ])
+
+
+class GroupRelationshipsTest(SimpleTestCase):
+    """Test grouping of relationship rows returned by get_with_relationships."""
+
+    def test_rows_are_grouped_by_type_with_name_fallbacks(self):
+        """Related names fall back to the first property, then to the element ID."""
+        rows = [
+            ['CONNECTS_TO', '4:aaa', 'Device', 'sw1', None],
+            ['CONNECTS_TO', '4:bbb', 'Device', None, {'serial': 'X1'}],
+            ['LOCATED_IN', '4:ccc', 'Site', None, {}],
+        ]
+
+        self.assertEqual(_group_relationships(rows, 'target'), {
+            'CONNECTS_TO': [
+                {'target_id': '4:aaa', 'target_label': 'Device', 'target_name': 'sw1'},
+                {'target_id': '4:bbb', 'target_label': 'Device', 'target_name': 'X1'},
+            ],
+            'LOCATED_IN': [
+                {'target_id': '4:ccc', 'target_label': 'Site', 'target_name': '4:ccc...'},
+            ],
+        })
@@ -7,7 +7,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 from cmdb.permissions import create_permissions_for_node_type, sync_all_node_type_permissions, delete_permissions_for_node_type
 from cmdb.registry import TypeRegistry
-from users.views import has_node_permission
+from users.views import has_node_permission, node_permission_required
 
 
 class DynamicPermissionCreationTest(TestCase):
@@ -153,6 +153,16 @@ class PermissionCheckingTest(TestCase):
         self.assertTrue(has_node_permission(self.regular_user, 'change', 'Device'))
         self.assertTrue(has_node_permission(self.regular_user, 'delete', 'Device'))
 
+    def test_permission_results_are_cached_per_user_instance(self):
+        """Test that results are memoized on the user object, like Django's _perm_cache."""
+        self.assertFalse(has_node_permission(self.regular_user, 'view', 'Device'))
+        self.regular_user.groups.add(self.viewer_group)
+
+        # Same instance (same request) keeps its answer; a fresh load sees the change
+        self.assertFalse(has_node_permission(self.regular_user, 'view', 'Device'))
+        fresh_user = User.objects.get(pk=self.regular_user.pk)
+        self.assertTrue(has_node_permission(fresh_user, 'view', 'Device'))
+
 
 class PermissionDecoratorTest(TestCase):
     """Test that view decorators enforce permissions."""
@@ -221,6 +231,11 @@ class PermissionDecoratorTest(TestCase):
         response = self.client.get(reverse('cmdb:node_create', args=['Network']))
         self.assertIn(response.status_code, [200, 500])
 
+    def test_unknown_action_is_rejected_at_decoration(self):
+        """Test that a misspelled action fails when the decorator is applied."""
+        with self.assertRaises(ValueError):
+            node_permission_required('veiw')
+
 
 class ContextProcessorTest(TestCase):
     """Test that context processors filter based on permissions."""
@@ -2,12 +2,14 @@
 import importlib
 import json
 import os
+import pickle
 import shutil
 
 import pandas as pd
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.cache import cache
 from django.http import HttpResponse, JsonResponse
 from django.middleware.csrf import get_token
 from django.shortcuts import render, redirect
@@ -19,6 +21,7 @@ from neomodel import db
 
 from .models import DynamicNode
 from .registry import TypeRegistry
+from cmdb.audit_helpers import audit_update_node
 from cmdb.audit_hooks import emit_audit
 from cmdb.feature_pack_models import sync_feature_pack_to_db
 from cmdb.feature_pack_views import (
@@ -36,6 +39,14 @@ from users.views import has_node_permission, node_permission_required
 # Constants for import functionality
 RELATIONSHIP_SUFFIX = '_names'
 CSV_ROW_OFFSET = 2  # Offset for error messages: 0-based index + header row
+IMPORT_CHUNK_SIZE = 5000  # Rows parsed and written per batch during import
+
+# Label is validated by the caller; labels cannot be query parameters in MATCH
+_TARGET_IDS_BY_NAME_QUERY = """
+    MATCH (n:`{label}`)
+    WHERE n.name IN $names
+    RETURN n.name AS name, elementId(n) AS eid
+"""
 
 def parse_property_definition(prop_def):
     """
@@ -342,13 +353,15 @@ def get_property_names(property_defs):
             names.append(parsed_prop['name'])
     return names
 
-def build_properties_list_with_relationships(node):
+def build_properties_list_with_relationships(node, out_rels=None, in_rels=None):
     """
     Helper function to build a properties list that includes both regular properties
     and relationships formatted as properties.
     
     Args:
         node: A DynamicNode instance
+        out_rels: Outgoing relationships if already fetched (queried otherwise)
+        in_rels: Incoming relationships if already fetched (queried otherwise)
         
     Returns:
         list: A list of property dictionaries with keys: key, value, value_type, 
@@ -366,9 +379,9 @@ def build_properties_list_with_relationships(node):
             'is_relationship': False,
         })
     
-    # Get relationships
-    out_rels = node.get_outgoing_relationships()
-    in_rels = node.get_incoming_relationships()
+    # Get relationships unless the caller already has them
+    if out_rels is None or in_rels is None:
+        out_rels, in_rels = node.get_relationships()
     
     # Add outbound relationships as properties
     for rel_type, targets in out_rels.items():
@@ -423,20 +436,11 @@ def dashboard(request):
     
     return render(request, 'cmdb/dashboard.html', context)
 
-@login_required
-@node_permission_required('view')
-def nodes_list(request, label):
+def _nodes_table_context(request, label):
     """
-    List view for nodes of a specific label
-    Supports HTMX partial updates
+    Build the paginated table context shared by nodes_list and the
+    nodes table partial returned after a delete.
     """
-    try:
-        node_class = DynamicNode.get_or_create_label(label)
-        nodes_queryset = node_class.nodes.all()
-    except Exception as e:
-        print(f"Error fetching {label}: {e}")
-        nodes_queryset = []
-
     page_number = request.GET.get('page', 1)
 
     # Persist per_page in session
@@ -451,7 +455,19 @@ def nodes_list(request, label):
         page_size = request.session.get('per_page', 50)
         page_size = max(1, min(page_size, 200))
 
-    paginator = Paginator(list(nodes_queryset), page_size)
+    paginator = Paginator([], page_size)
+    page_relationships = {}
+    try:
+        node_class = DynamicNode.get_or_create_label(label)
+        # Node list and page relationships share one session and read transaction
+        with db.read_transaction:
+            paginator = Paginator(list(node_class.nodes.all()), page_size)
+            page_ids = [node.element_id for node in paginator.get_page(page_number).object_list]
+            # Relationships for the whole page, both directions, in one query
+            page_relationships = node_class.get_relationships_bulk(page_ids)
+    except Exception as e:
+        print(f"Error fetching {label}: {e}")
+
     page_obj = paginator.get_page(page_number)
     nodes = page_obj.object_list
     
@@ -459,6 +475,7 @@ def nodes_list(request, label):
     metadata = TypeRegistry.get_metadata(label)
     default_columns = get_property_names(metadata.get('columns', []))
     all_properties = get_property_names(metadata.get('properties', []))
+    prop_set = frozenset(all_properties)
     
     # Collect all relationship types found across all nodes
     all_relationship_types = set()
@@ -467,32 +484,29 @@ def nodes_list(request, label):
     nodes_data = []
     for node in nodes:
         props = node.custom_properties or {}
+        element_id = node.element_id
+        # Every property gets a cell (so DOM elements exist for column toggle)
+        columns = dict.fromkeys(all_properties, '')
+        columns.update({key: value for key, value in props.items() if key in prop_set})
         node_data = {
-            'element_id': node.element_id,
+            'element_id': element_id,
             'node': node,
-            'columns': {}
+            'columns': columns,
         }
         
-        # Extract values for ALL properties (so DOM elements exist for column toggle)
-        for prop in all_properties:
-            node_data['columns'][prop] = props.get(prop, '')
-        
-        # Fetch relationships for this node
-        out_rels = node.get_outgoing_relationships()
-        in_rels = node.get_incoming_relationships()
+        out_rels, in_rels = page_relationships.get(element_id, ({}, {}))
         
         # Add outbound relationships as columns
         for rel_type, targets in out_rels.items():
             all_relationship_types.add(rel_type)
-            target_values = [f"{t['target_label']}:{t['target_name']}" for t in targets]
-            node_data['columns'][rel_type] = ', '.join(target_values)
+            # Joined for display by the template
+            columns[rel_type] = [f"{t['target_label']}:{t['target_name']}" for t in targets]
         
         # Add inbound relationships as columns
         for rel_type, sources in in_rels.items():
             rel_key = f"{rel_type} (incoming)"
             all_relationship_types.add(rel_key)
-            source_values = [f"{s['source_label']}:{s['source_name']}" for s in sources]
-            node_data['columns'][rel_key] = ', '.join(source_values)
+            columns[rel_key] = [f"{s['source_label']}:{s['source_name']}" for s in sources]
         
         # Also compute display_name for backwards compatibility
         if 'name' in props:
@@ -508,13 +522,14 @@ def nodes_list(request, label):
     # Combine properties and relationships for all_properties list
     all_properties_with_rels = list(all_properties) + sorted(all_relationship_types)
             
-    context = {
+    return {
         'label': label,
         'nodes': nodes_data,
         'columns': default_columns,
         'columns_json': json.dumps(default_columns),
         'all_properties': all_properties_with_rels,
         'all_properties_json': json.dumps(all_properties_with_rels),
+        'relationship_columns': all_relationship_types,
         'all_labels': TypeRegistry.known_labels(),
         'page_obj': page_obj,
         'paginator': paginator,
@@ -522,17 +537,31 @@ def nodes_list(request, label):
         'per_page_options': [10, 25, 50, 100, 200],
     }
 
+
+def _render_nodes_table(request, label):
+    """Render only the nodes table partial for a label."""
+    return render(request, 'cmdb/partials/nodes_table.html', _nodes_table_context(request, label))
+
+
+@login_required
+@node_permission_required('view')
+def nodes_list(request, label):
+    """
+    List view for nodes of a specific label
+    Supports HTMX partial updates
+    """
     # If request is from HTMX, return content + header for OOB swap
     if request.htmx:
         # Check if this is a table-only refresh (from refresh button)
         if request.headers.get('HX-Target') == 'nodes-content':
-            return render(request, 'cmdb/partials/nodes_table.html', context)
+            return _render_nodes_table(request, label)
         # Otherwise it's a full navigation, include header
+        context = _nodes_table_context(request, label)
         content_html = render_to_string('cmdb/partials/nodes_list_content.html', context, request=request)
         header_html = render_to_string('cmdb/partials/nodes_list_header.html', context, request=request)
         return HttpResponse(content_html + header_html)
 
-    return render(request, 'cmdb/nodes_list.html', context)
+    return render(request, 'cmdb/nodes_list.html', _nodes_table_context(request, label))
 
 @require_http_methods(["GET"])
 def node_add_relationship_form(request, label, element_id):
@@ -552,14 +581,44 @@ def node_add_relationship_form(request, label, element_id):
         return render(request, 'cmdb/partials/add_relationship_form.html', context)
     except Exception as e:
         return HttpResponse(f'<div class="p-4 bg-red-100 text-red-800 rounded">Error loading form: {str(e)}</div>')
-    
+
+
+def _feature_pack_tab_context(request, tab, label, element_id, node):
+    """
+    Call a feature pack tab's custom view. Tabs that set 'cache_timeout' (seconds)
+    have their result cached per user, keyed on the node's updated_at so edits
+    and relationship changes to the node start a fresh entry.
+
+    A cached tab's view must return only plain, picklable values (strings, numbers,
+    lists and dicts of them), not nodes, querysets or the request. A context that
+    cannot be pickled is returned uncached.
+    """
+    module_path, func_name = tab['custom_view'].rsplit('.', 1)
+    custom_view_func = getattr(importlib.import_module(module_path), func_name)
+
+    timeout = tab.get('cache_timeout')
+    if not timeout:
+        return custom_view_func(request, label, element_id)
+
+    updated_at = node.updated_at.timestamp() if node.updated_at else 0
+    cache_key = f"tabctx:{tab.get('id')}:{label}:{element_id}:{updated_at}:{request.user.pk}"
+    tab_context = cache.get(cache_key)
+    if tab_context is None:
+        tab_context = custom_view_func(request, label, element_id)
+        try:
+            cache.set(cache_key, tab_context, timeout)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            pass
+    return tab_context
+
+
 @login_required
 @node_permission_required('view')
 def node_detail(request, label, element_id):
     try:
         node_class = DynamicNode.get_or_create_label(label)
-        # Use helper method instead of raw Cypher
-        node = node_class.get_by_element_id(element_id)
+        # Node and both relationship directions in one query
+        node, out_rels, in_rels = node_class.get_with_relationships(element_id)
         if not node:
             raise node_class.DoesNotExist
 
@@ -570,11 +629,7 @@ def node_detail(request, label, element_id):
             display_name = f"{element_id[:8]}..."
         
         # Build properties list with relationships using helper function
-        props_list = build_properties_list_with_relationships(node)
-        
-        # Get relationships for backwards compatibility with templates
-        out_rels = node.get_outgoing_relationships()
-        in_rels = node.get_incoming_relationships()
+        props_list = build_properties_list_with_relationships(node, out_rels, in_rels)
 
         feature_pack_tabs = []
         for tab in getattr(settings, 'FEATURE_PACK_TABS', []):
@@ -589,10 +644,7 @@ def node_detail(request, label, element_id):
                 if 'tab_order' not in tab_copy:
                     tab_copy['tab_order'] = 2  # Default feature pack tabs come after core details (1)
                 if tab.get('custom_view'):
-                    # Call the pack's custom view function
-                    pack_view = importlib.import_module(tab['custom_view'].rsplit('.', 1)[0])
-                    custom_view_func = getattr(pack_view, tab['custom_view'].rsplit('.', 1)[1])
-                    tab_copy['context'] = custom_view_func(request, label, element_id)
+                    tab_copy['context'] = _feature_pack_tab_context(request, tab, label, element_id, node)
                 feature_pack_tabs.append(tab_copy)
         
         # Sort tabs by tab_order (0-100 range, left to right)
@@ -739,10 +791,8 @@ def node_edit(request, label, element_id):
         if raw_json:
             try:
                 raw_props = json.loads(raw_json)
-                # Compare without whitespace/formatting (normalize)
-                normalized_raw = json.dumps(raw_props, sort_keys=True)
-                normalized_original = json.dumps(json.loads(original_json or '{}'), sort_keys=True)
-                if normalized_raw != normalized_original:
+                # Compare parsed values so whitespace/key order differences are ignored
+                if raw_props != json.loads(original_json or '{}'):
                     new_props = raw_props  # Override with raw JSON
             except json.JSONDecodeError:
                 # Invalid raw → ignore, use fields
@@ -756,26 +806,7 @@ def node_edit(request, label, element_id):
         node.save()
 
         # Create audit log entry
-        node_name = current.get('name', '')
-        changed_keys = [k for k in new_props.keys() if old_props.get(k) != new_props.get(k)]
-        changes_detail = {
-            key: {
-                'old': old_props.get(key),
-                'new': current.get(key)
-            }
-            for key in set(old_props.keys()) | set(current.keys())
-            if old_props.get(key) != current.get(key)
-        }
-        emit_audit(
-            action='update',
-            node_label=label,
-            node_id=element_id,
-            node_name=node_name,
-            user=request.user.username if request.user.is_authenticated else 'System',
-            changes=json.dumps(changes_detail, sort_keys=True, indent=2) if changes_detail else "Properties updated",
-            old_props=old_props,
-            new_props=current
-        )
+        audit_update_node(label, element_id, old_props, current, request.user)
 
         return render(request, 'cmdb/partials/edit_success.html', {
             'message': 'Node updated successfully'
@@ -820,58 +851,7 @@ def node_delete(request, label, element_id):
         node.delete()
 
         # Return refreshed table body (same as nodes_list partial)
-        nodes = node_class.nodes.all()[:50]
-        
-        # Get column configuration from type registry
-        metadata = TypeRegistry.get_metadata(label)
-        default_columns = metadata.get('columns', [])
-        all_properties = metadata.get('properties', [])
-        
-        # Collect all relationship types found across all nodes
-        all_relationship_types = set()
-        
-        # Extract property values for each node - FOR ALL PROPERTIES
-        nodes_data = []
-        for node in nodes:
-            props = node.custom_properties or {}
-            node_data = {
-                'element_id': node.element_id,
-                'node': node,
-                'columns': {}
-            }
-            
-            # Extract values for ALL properties (so DOM elements exist for column toggle)
-            for prop in all_properties:
-                node_data['columns'][prop] = props.get(prop, '')
-            
-            # Fetch relationships for this node
-            out_rels = node.get_outgoing_relationships()
-            in_rels = node.get_incoming_relationships()
-            
-            # Add outbound relationships as columns
-            for rel_type, targets in out_rels.items():
-                all_relationship_types.add(rel_type)
-                target_values = [f"{t['target_label']}:{t['target_name']}" for t in targets]
-                node_data['columns'][rel_type] = ', '.join(target_values)
-            
-            # Add inbound relationships as columns
-            for rel_type, sources in in_rels.items():
-                rel_key = f"{rel_type} (incoming)"
-                all_relationship_types.add(rel_key)
-                source_values = [f"{s['source_label']}:{s['source_name']}" for s in sources]
-                node_data['columns'][rel_key] = ', '.join(source_values)
-            
-            nodes_data.append(node_data)
-        
-        # Combine properties and relationships for all_properties list
-        all_properties_with_rels = list(all_properties) + sorted(all_relationship_types)
-        
-        return render(request, 'cmdb/partials/nodes_table.html', {
-            'nodes': nodes_data,
-            'columns': default_columns,
-            'all_properties': all_properties_with_rels,
-            'label': label,
-        })
+        return _render_nodes_table(request, label)
 
     except Exception as e:
         return render(request, 'cmdb/partials/nodes_table.html', {
@@ -1046,14 +1026,16 @@ def node_connect(request, label, element_id):
 
         # Use helper method to create relationship
         node_class = DynamicNode.get_or_create_label(label)
-        success = node_class.connect_nodes(element_id, label, rel_type, target_id, target_label)
-        if not success:
-            raise ValueError("Failed to create relationship")
-
-        # Get updated node and rebuild properties list with relationships
-        node = node_class.get_by_element_id(element_id)
-        if not node:
-            raise ValueError("Source node not found")
+        # Write and re-read share one session and transaction
+        with db.transaction:
+            success = node_class.connect_nodes(element_id, label, rel_type, target_id, target_label)
+            if not success:
+                raise ValueError("Failed to create relationship")
+
+            # Get updated node and its relationships in one query
+            node, out_rels, in_rels = node_class.get_with_relationships(element_id)
+            if not node:
+                raise ValueError("Source node not found")
         
         # Create audit log entry
         node_name = (node.custom_properties or {}).get('name', '')
@@ -1068,10 +1050,8 @@ def node_connect(request, label, element_id):
             target_id=target_id
         )
             
-        out_rels = node.get_outgoing_relationships()
-        in_rels = node.get_incoming_relationships()
         # Build properties list using helper function
-        props_list = build_properties_list_with_relationships(node)
+        props_list = build_properties_list_with_relationships(node, out_rels, in_rels)
 
         return render(request, 'cmdb/partials/properties_section.html', {
             'properties_list': props_list,
@@ -1102,14 +1082,16 @@ def node_disconnect(request, label, element_id):
 
         # Use helper method to delete relationship
         node_class = DynamicNode.get_or_create_label(label)
-        deleted = node_class.disconnect_nodes(element_id, label, rel_type, target_id, target_label)
-        if deleted == 0:
-            raise ValueError("Relationship not found")
-
-        # Get updated node and rebuild properties list with relationships
-        node = node_class.get_by_element_id(element_id)
-        if not node:
-            raise ValueError("Source node not found")
+        # Write and re-read share one session and transaction
+        with db.transaction:
+            deleted = node_class.disconnect_nodes(element_id, label, rel_type, target_id, target_label)
+            if deleted == 0:
+                raise ValueError("Relationship not found")
+
+            # Get updated node and its relationships in one query
+            node, out_rels, in_rels = node_class.get_with_relationships(element_id)
+            if not node:
+                raise ValueError("Source node not found")
         
         # Create audit log entry
         node_name = (node.custom_properties or {}).get('name', '')
@@ -1124,10 +1106,8 @@ def node_disconnect(request, label, element_id):
             target_id=target_id
         )
             
-        out_rels = node.get_outgoing_relationships()
-        in_rels = node.get_incoming_relationships()
         # Build properties list using helper function
-        props_list = build_properties_list_with_relationships(node)
+        props_list = build_properties_list_with_relationships(node, out_rels, in_rels)
 
         return render(request, 'cmdb/partials/properties_section.html', {
             'properties_list': props_list,
@@ -1159,13 +1139,13 @@ def get_target_nodes(request):
 
     try:
         node_class = DynamicNode.get_or_create_label(target_label)
-        nodes = node_class.nodes.all()[:200]
+        nodes = node_class.get_display_options(limit=200)
 
         def node_display(node):
-            props = node.custom_properties or {}
+            props = node['custom_properties']
             if target_label == 'IP_Address' and props.get('address'):
                 return str(props.get('address'))
-            return str(props.get('name') or props.get('primary_ns') or node.element_id)
+            return str(props.get('name') or props.get('primary_ns') or node['element_id'])
 
         if query:
             nodes = [n for n in nodes if query in node_display(n).lower()]
@@ -1191,6 +1171,197 @@ def get_target_nodes(request):
 
 
 
+def _iter_excel_chunks(uploaded_file, file_ext):
+    """
+    Split an Excel sheet into IMPORT_CHUNK_SIZE row blocks.
+    Excel files cannot be streamed by pandas, so the sheet is read up front
+    (raising read errors immediately) and sliced lazily.
+    """
+    engine = 'openpyxl' if file_ext == 'xlsx' else None
+    df = pd.read_excel(uploaded_file, engine=engine)
+    return (df.iloc[start:start + IMPORT_CHUNK_SIZE] for start in range(0, len(df), IMPORT_CHUNK_SIZE))
+
+
+def _import_chunk(request, label, node_class, df_chunk, properties, required_props, relationships):
+    """
+    Import one chunk inside a single transaction so its writes are committed together.
+    If the transaction fails, it is rolled back and the chunk is retried row by row
+    so the failing rows can be reported individually.
+    """
+    args = (request, label, node_class, df_chunk, properties, required_props, relationships)
+    try:
+        with db.transaction:
+            created_count, relationship_queue, errors, audit_events = _process_import_chunk(*args, atomic=True)
+    except Exception:
+        created_count, relationship_queue, errors, audit_events = _process_import_chunk(*args)
+    
+    # Audit hooks write on their own thread and connection, outside this transaction,
+    # so only rows whose nodes were committed are audited, once
+    for event in audit_events:
+        emit_audit(**event)
+    return created_count, relationship_queue, errors
+
+
+def _process_import_chunk(request, label, node_class, df_chunk, properties, required_props, relationships,
+                          atomic=False):
+    """
+    Create nodes for one chunk of imported rows.
+    When atomic is True, row errors are raised instead of collected so the
+    surrounding transaction is rolled back.
+    
+    Returns:
+        tuple: (created_count, relationship_queue, errors, audit_events) where
+               relationship_queue holds (element_id, node_name, row_relationships) for
+               rows with relationship columns and audit_events holds the emit_audit()
+               keyword arguments for each created node, to be emitted by the caller
+    """
+    created_count = 0
+    relationship_queue = []
+    errors = []
+    audit_events = []
+    
+    for idx, row in df_chunk.iterrows():
+        try:
+            # Build properties dict from row
+            node_props = {}
+            row_relationships = {}
+            
+            for col in df_chunk.columns:
+                value = row[col]
+                
+                # Skip NaN values
+                if pd.isna(value):
+                    continue
+                
+                # Check if this is a relationship column
+                if col.endswith(RELATIONSHIP_SUFFIX):
+                    rel_type = col[:-len(RELATIONSHIP_SUFFIX)]  # Remove suffix
+                    # Relationship types in metadata are uppercase (e.g., BELONGS_TO)
+                    # Check if this matches a known relationship (case-insensitive)
+                    rel_type_upper = rel_type.upper()
+                    if rel_type_upper in relationships:
+                        # Store with uppercase key for consistency
+                        row_relationships[rel_type_upper] = str(value)
+                    continue
+                
+                # Regular property
+                if col in properties:
+                    # Type coercion
+                    if isinstance(value, (int, float, bool)):
+                        node_props[col] = value
+                    else:
+                        node_props[col] = str(value)
+            
+            # Validate required properties
+            missing = [r for r in required_props if r not in node_props or not node_props[r]]
+            if missing:
+                errors.append(f"Row {idx + CSV_ROW_OFFSET}: Missing required properties: {', '.join(missing)}")
+                continue
+            
+            # Create node
+            node = node_class(custom_properties=node_props).save()
+            created_count += 1
+            
+            # Queue relationships for creation once every chunk has been imported
+            if row_relationships:
+                relationship_queue.append((
+                    node.element_id,
+                    node_props.get('name', node.element_id),
+                    row_relationships,
+                ))
+            
+            # Audit log entry, emitted by the caller once the node is committed
+            node_name = node_props.get('name', '')
+            audit_events.append({
+                'action': 'create',
+                'node_label': label,
+                'node_id': node.element_id,
+                'node_name': node_name,
+                'user': request.user.username if request.user.is_authenticated else 'System',
+                'changes': f"Imported from file with properties: {', '.join(node_props.keys())}",
+            })
+            
+        except Exception as e:
+            if atomic:
+                raise
+            errors.append(f"Row {idx + CSV_ROW_OFFSET}: {str(e)}")
+    
+    return created_count, relationship_queue, errors, audit_events
+
+
+def _create_import_relationships(label, node_class, relationships, relationship_queue):
+    """
+    Create the relationships queued by _process_import_chunk.
+    Returns a list of error messages.
+    """
+    errors = []
+    pending = []  # (element_id, node_name, rel_type, target_label, target_name)
+    names_by_label = {}
+    for element_id, node_name, row_relationships in relationship_queue:
+        for rel_type, target_names in row_relationships.items():
+            # Split multiple target names by comma
+            target_name_list = [name.strip() for name in target_names.split(',')]
+            
+            # Get target label from relationships metadata
+            rel_info = relationships.get(rel_type, {})
+            target_label = rel_info.get('target')  # Field is 'target' not 'target_label'
+            
+            if not target_label:
+                errors.append(f"Node '{node_name}': Unknown relationship type '{rel_type}'")
+                continue
+            
+            # Validate target_label to prevent injection
+            # Target labels come from metadata but validate for safety
+            if not target_label or not target_label.replace('_', '').isalnum():
+                errors.append(f"Node '{node_name}': Invalid target label '{target_label}' for relationship '{rel_type}'")
+                continue
+            
+            for target_name in target_name_list:
+                pending.append((element_id, node_name, rel_type, target_label, target_name))
+                names_by_label.setdefault(target_label, set()).add(target_name)
+    
+    # Resolve all referenced target names with one indexed lookup per label
+    target_ids = {}
+    for target_label, names in names_by_label.items():
+        result, _ = db.cypher_query(
+            _TARGET_IDS_BY_NAME_QUERY.format(label=target_label), {'names': list(names)}
+        )
+        for name, eid in result:
+            target_ids.setdefault((target_label, name), eid)
+    
+    # Group resolved pairs so each relationship type/target label is created in batches
+    batches = {}
+    for element_id, node_name, rel_type, target_label, target_name in pending:
+        target_id = target_ids.get((target_label, target_name))
+        if not target_id:
+            errors.append(f"Node '{node_name}': Target node '{target_name}' of type '{target_label}' not found for relationship '{rel_type}'")
+            continue
+        batches.setdefault((rel_type, target_label), []).append((element_id, node_name, target_id, target_name))
+    
+    for (rel_type, target_label), items in batches.items():
+        for start in range(0, len(items), IMPORT_CHUNK_SIZE):
+            batch = items[start:start + IMPORT_CHUNK_SIZE]
+            try:
+                with db.transaction:
+                    node_class.connect_nodes_bulk(
+                        label, rel_type, target_label,
+                        [(element_id, target_id) for element_id, _, target_id, _ in batch]
+                    )
+            except Exception:
+                # Batch was rolled back; retry one by one to report the failing pairs
+                for element_id, node_name, target_id, target_name in batch:
+                    try:
+                        node_class.connect_nodes(
+                            element_id, label,
+                            rel_type,  # Already uppercase from storage
+                            target_id, target_label
+                        )
+                    except Exception as e:
+                        errors.append(f"Node '{node_name}': Failed to create relationship '{rel_type}' to '{target_name}': {str(e)}")
+    
+    return errors
+
+
 @require_http_methods(["GET", "POST"])
 @login_required
 @node_permission_required('add')
@@ -1248,12 +1419,12 @@ def node_import(request, label):
         uploaded_file = request.FILES['import_file']
         file_ext = uploaded_file.name.split('.')[-1].lower()
         
-        # Read file into DataFrame
+        # Read file in chunks so rows are written while the rest is still being parsed
         try:
             if file_ext == 'csv':
-                df = pd.read_csv(uploaded_file)
+                chunks = pd.read_csv(uploaded_file, chunksize=IMPORT_CHUNK_SIZE)
             elif file_ext in ['xls', 'xlsx']:
-                df = pd.read_excel(uploaded_file)
+                chunks = _iter_excel_chunks(uploaded_file, file_ext)
             else:
                 context['error'] = 'Unsupported file format. Please upload CSV or Excel file.'
                 return render(request, 'cmdb/node_import.html', context)
@@ -1261,131 +1432,28 @@ def node_import(request, label):
             context['error'] = f'Error reading file: {str(e)}'
             return render(request, 'cmdb/node_import.html', context)
         
-        # Process each row
         node_class = DynamicNode.get_or_create_label(label)
-        created_nodes = []
+        created_count = 0
         errors = []
         relationship_queue = []  # Store relationships to create after all nodes
         
-        for idx, row in df.iterrows():
-            try:
-                # Build properties dict from row
-                node_props = {}
-                row_relationships = {}
-                
-                for col in df.columns:
-                    value = row[col]
-                    
-                    # Skip NaN values
-                    if pd.isna(value):
-                        continue
-                    
-                    # Check if this is a relationship column
-                    if col.endswith(RELATIONSHIP_SUFFIX):
-                        rel_type = col[:-len(RELATIONSHIP_SUFFIX)]  # Remove suffix
-                        # Relationship types in metadata are uppercase (e.g., BELONGS_TO)
-                        # Check if this matches a known relationship (case-insensitive)
-                        rel_type_upper = rel_type.upper()
-                        if rel_type_upper in relationships:
-                            # Store with uppercase key for consistency
-                            row_relationships[rel_type_upper] = str(value)
-                        continue
-                    
-                    # Regular property
-                    if col in properties:
-                        # Type coercion
-                        if isinstance(value, (int, float, bool)):
-                            node_props[col] = value
-                        else:
-                            node_props[col] = str(value)
-                
-                # Validate required properties
-                missing = [r for r in required_props if r not in node_props or not node_props[r]]
-                if missing:
-                    errors.append(f"Row {idx + CSV_ROW_OFFSET}: Missing required properties: {', '.join(missing)}")
-                    continue
-                
-                # Create node
-                node = node_class(custom_properties=node_props).save()
-                created_nodes.append(node)
-                
-                # Queue relationships for creation
-                if row_relationships:
-                    relationship_queue.append({
-                        'node': node,
-                        'relationships': row_relationships
-                    })
-                
-                # Create audit log entry
-                node_name = node_props.get('name', '')
-                emit_audit(
-                    action='create',
-                    node_label=label,
-                    node_id=node.element_id,
-                    node_name=node_name,
-                    user=request.user.username if request.user.is_authenticated else 'System',
-                    changes=f"Imported from file with properties: {', '.join(node_props.keys())}"
+        try:
+            for df_chunk in chunks:
+                chunk_created, chunk_relationships, chunk_errors = _import_chunk(
+                    request, label, node_class, df_chunk,
+                    properties, required_props, relationships,
                 )
-                
-            except Exception as e:
-                errors.append(f"Row {idx + CSV_ROW_OFFSET}: {str(e)}")
+                created_count += chunk_created
+                relationship_queue.extend(chunk_relationships)
+                errors.extend(chunk_errors)
+        except Exception as e:
+            errors.append(f'Error reading file: {str(e)}')
         
-        # Process queued relationships
-        for item in relationship_queue:
-            node = item['node']
-            node_name = (node.custom_properties or {}).get('name', node.element_id)
-            
-            for rel_type, target_names in item['relationships'].items():
-                # Split multiple target names by comma
-                target_name_list = [name.strip() for name in target_names.split(',')]
-                
-                # Get target label from relationships metadata
-                rel_info = relationships.get(rel_type, {})
-                target_label = rel_info.get('target')  # Field is 'target' not 'target_label'
-                
-                if not target_label:
-                    errors.append(f"Node '{node_name}': Unknown relationship type '{rel_type}'")
-                    continue
-                
-                # Validate target_label to prevent injection
-                # Target labels come from metadata but validate for safety
-                if not target_label or not target_label.replace('_', '').isalnum():
-                    errors.append(f"Node '{node_name}': Invalid target label '{target_label}' for relationship '{rel_type}'")
-                    continue
-                
-                # Find target nodes by name
-                target_class = DynamicNode.get_or_create_label(target_label)
-                
-                for target_name in target_name_list:
-                    # Query for target node by name property
-                    query = f"""
-                        MATCH (n:`{target_label}`)
-                        WHERE n.custom_properties IS NOT NULL
-                        AND apoc.convert.fromJsonMap(n.custom_properties).name = $name
-                        RETURN elementId(n) AS eid
-                        LIMIT 1
-                    """
-                    result, _ = db.cypher_query(query, {'name': target_name})
-                    
-                    if not result:
-                        errors.append(f"Node '{node_name}': Target node '{target_name}' of type '{target_label}' not found for relationship '{rel_type}'")
-                        continue
-                    
-                    target_id = result[0][0]
-                    
-                    # Create relationship
-                    try:
-                        node_class.connect_nodes(
-                            node.element_id, label,
-                            rel_type,  # Already uppercase from storage
-                            target_id, target_label
-                        )
-                    except Exception as e:
-                        errors.append(f"Node '{node_name}': Failed to create relationship '{rel_type}' to '{target_name}': {str(e)}")
+        errors.extend(_create_import_relationships(label, node_class, relationships, relationship_queue))
         
         # Prepare success/error summary
         context['success'] = True
-        context['created_count'] = len(created_nodes)
+        context['created_count'] = created_count
         context['error_count'] = len(errors)
         context['errors'] = errors
         
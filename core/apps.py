@@ -3,215 +3,448 @@ from django.apps import AppConfig, apps
 from django.conf import settings
 from django.core.signals import request_started
 from django.db.models.signals import post_migrate
-from django.dispatch import receiver
 import os
+import hashlib
 import importlib.util
-import json
-from cmdb.registry import TypeRegistry
-from cmdb.audit_hooks import register_audit_hook
-from django.urls import path, include
+import logging
+import pickle
 import sys
+import threading
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Threads used to read pack files at startup; the work is IO-bound
+PACK_LOAD_WORKERS = 8
 
 
 def reload_feature_packs():
-    feature_packs_dir = os.path.join(settings.BASE_DIR, 'feature_packs')
+    from cmdb.registry import TypeRegistry
 
-    TypeRegistry.clear()
     settings.FEATURE_PACK_TABS = []
     settings.FEATURE_PACK_MODALS = []
     settings.FEATURE_PACK_URLS = []
 
-    existing_dirs = settings.TEMPLATES[0]['DIRS']
+    pack_template_dirs = set(getattr(settings, 'FEATURE_PACK_TEMPLATE_DIRS', []))
     settings.TEMPLATES[0]['DIRS'] = [
-        directory for directory in existing_dirs
-        if not str(directory).startswith(feature_packs_dir)
+        directory for directory in settings.TEMPLATES[0]['DIRS']
+        if directory not in pack_template_dirs
     ]
+    settings.FEATURE_PACK_TEMPLATE_DIRS = []
 
     core_app = apps.get_app_config('core')
-    core_app.load_feature_packs()
+    # Types are re-registered in place so unchanged ones keep their registry entry
+    # (and TypeRegistry.version); only types that are gone are dropped
+    TypeRegistry.retain(core_app.load_feature_packs())
+    core_app._warm_up_pack_views()
+    # Newly registered types need their property indexes; this runs from an admin
+    # action, not the request path, and already-done backfills are skipped
+    core_app.ensure_indexes()
+
+def _get_pack_cache_file():
+    return str(getattr(
+        settings, 'FEATURE_PACK_CACHE_FILE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'graphcmdb', 'feature_packs.pickle'),
+    ))
+
+
+def _load_pack_cache():
+    """Load the parsed pack cache, returning an empty cache if it is missing or unreadable."""
+    try:
+        with open(_get_pack_cache_file(), 'rb') as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_pack_cache(cache):
+    cache_file = _get_pack_cache_file()
+    # Skip packs whose config holds values that cannot be pickled
+    picklable = {}
+    for pack_name, entry in cache.items():
+        try:
+            pickle.dumps(entry)
+        except Exception:
+            continue
+        picklable[pack_name] = entry
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(picklable, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning("Could not write feature pack cache: %s", e)
+
+
+PACK_SOURCE_FILES = ('types.json', 'config.py')
+
+
+def _read_pack_sources(pack_path):
+    """
+    Read a pack's types.json and config.py once.
+
+    Returns ({filename: bytes or None}, content_hash); the sha256 covers both
+    files, so it changes whenever either file's content does.
+    """
+    sources = {}
+    digest = hashlib.sha256()
+    for filename in PACK_SOURCE_FILES:
+        try:
+            with open(os.path.join(pack_path, filename), 'rb') as f:
+                sources[filename] = f.read()
+        except FileNotFoundError:
+            sources[filename] = None
+        digest.update(filename.encode())
+        digest.update(b'\0' if sources[filename] is None else b'\1' + sources[filename])
+    return sources, digest.hexdigest()
+
+
+def _parse_pack(pack_name, pack_path, sources, content_hash, cached):
+    """
+    Parse a pack's types.json and config.py from their bytes, reusing the
+    cached parse if the content hash is unchanged.
+
+    Returns (types_data, config_data, cache_entry); cache_entry is None on a cache hit.
+    """
+    if cached and cached.get('path') == pack_path and cached.get('content_hash') == content_hash:
+        logger.debug("Using cached types/config for %s", pack_name)
+        return cached['types_data'], cached['config_data'], None
+
+    types_data, config_data = _parse_pack_sources(pack_name, pack_path, sources)
+    cache_entry = {
+        'path': pack_path,
+        'content_hash': content_hash,
+        'types_data': types_data,
+        'config_data': config_data,
+    }
+    return types_data, config_data, cache_entry
+
+
+def _parse_pack_sources(pack_name, pack_path, sources):
+    """Parse a pack's types.json and execute its config.py."""
+    types_data = None
+    if sources['types.json'] is not None:
+        logger.debug("Loading types.json for %s", pack_name)
+        types_data = orjson.loads(sources['types.json'])
+
+    config_data = None
+    if sources['config.py'] is not None:
+        logger.debug("Loading config.py for %s", pack_name)
+        config_path = os.path.join(pack_path, 'config.py')
+        spec = importlib.util.spec_from_file_location(f"{pack_name}.config", config_path)
+        config_module = importlib.util.module_from_spec(spec)
+        exec(compile(sources['config.py'], config_path, 'exec'), config_module.__dict__)
+        config_data = config_module.FEATURE_PACK_CONFIG
+
+    return types_data, config_data
+
+
+def _sync_packs_to_db(packs):
+    from cmdb.feature_pack_models import sync_feature_packs_to_db_bulk
+
+    if not packs:
+        return
+    try:
+        logger.debug("Syncing %s pack(s) to GraphDB...", len(packs))
+        sync_feature_packs_to_db_bulk(packs)
+        logger.debug("Successfully synced packs to GraphDB")
+    except Exception as e:
+        logger.warning("Error syncing packs to GraphDB: %s", e)
+
 
 class CoreConfig(AppConfig):
     name = 'core'
+    # Packs read at startup whose GraphDB record is still to be written
+    _pending_pack_sync = []
+    _pack_sync_lock = threading.Lock()
     _permissions_synced = False
+    _indexes_ensured = False
 
     def ready(self):
-        self.load_feature_packs()
+        # Types, template dirs and URLs must be registered before system checks build
+        # the template engines and URL resolvers; only the GraphDB sync waits for the
+        # first request (or migrate).
+        if os.environ.get('SKIP_FEATURE_PACKS') == '1':
+            logger.debug("SKIP_FEATURE_PACKS is set, not loading feature packs")
+        else:
+            self.load_feature_packs(defer_sync=True)
+        request_started.connect(self._sync_packs_once, dispatch_uid='core.sync_packs_once')
+        post_migrate.connect(self._sync_packs_once, dispatch_uid='core.sync_packs_post_migrate')
         request_started.connect(self._sync_permissions_once, dispatch_uid='core.sync_permissions_once')
         post_migrate.connect(self._sync_permissions_once, dispatch_uid='core.sync_permissions_post_migrate')
+        # Index creation and backfills scan the graph, so they run after migrate (or via
+        # the ensure_graph_indexes command) rather than on a worker's first request
+        post_migrate.connect(self._ensure_indexes_once, dispatch_uid='core.ensure_indexes_post_migrate')
+
+    def _sync_packs_once(self, **kwargs):
+        if not self._pending_pack_sync:
+            return
+        # Concurrent first requests must not write the same packs twice
+        with self._pack_sync_lock:
+            packs, self._pending_pack_sync = self._pending_pack_sync, []
+        _sync_packs_to_db(packs)
 
     def _sync_permissions_once(self, **kwargs):
         if self._permissions_synced:
             return
         try:
             from cmdb.permissions import sync_all_node_type_permissions
-            print(f"[DEBUG] Syncing permissions for node types...")
+            logger.debug("Syncing permissions for node types...")
             sync_all_node_type_permissions()
             self._permissions_synced = True
         except Exception as e:
-            print(f"[DEBUG] Could not sync permissions (database may not be ready): {e}")
+            logger.warning("Could not sync permissions (database may not be ready): %s", e)
 
-    def load_feature_packs(self):
+    def _ensure_indexes_once(self, **kwargs):
+        # post_migrate fires once per migrated app
+        if self._indexes_ensured:
+            return
+        self._indexes_ensured = True
+        self.ensure_indexes()
+
+    def ensure_indexes(self):
+        """
+        Create property indexes and run pending backfills for every registered type.
+        Returns False if GraphDB could not be reached.
+        """
+        try:
+            from cmdb.models import ensure_property_indexes
+            from cmdb.registry import TypeRegistry
+            logger.debug("Ensuring property indexes for node types...")
+            ensure_property_indexes(TypeRegistry.known_labels())
+        except Exception as e:
+            logger.warning("Could not ensure property indexes (GraphDB may not be ready): %s", e)
+            return False
+        return True
+
+    def load_feature_packs(self, defer_sync=False):
         """
         Load feature packs from filesystem and sync to GraphDB.
         Also loads enabled packs from GraphDB on startup.
+
+        With defer_sync, new or changed packs are only queued for GraphDB;
+        _sync_packs_once writes them on the first request.
+
+        Returns the set of type labels registered by enabled packs.
         """
-        from cmdb.feature_pack_models import (
-            sync_feature_pack_to_db, 
-            should_sync_pack,
-            FeaturePackNode,
-        )
+        from cmdb.feature_pack_models import should_sync_pack, FeaturePackNode
+        from cmdb.registry import TypeRegistry
+        from cmdb.audit_hooks import register_audit_hook
         
         feature_packs_dir = os.path.join(settings.BASE_DIR, 'feature_packs')
-        print(f"[DEBUG] Looking for feature packs in: {feature_packs_dir}")
+        logger.debug("Looking for feature packs in: %s", feature_packs_dir)
         
+        registered_labels = set()
         if not os.path.exists(feature_packs_dir):
-            print(f"[DEBUG] Feature packs directory does not exist")
-            return
+            logger.debug("Feature packs directory does not exist")
+            return registered_labels
 
-        # First, load from GraphDB to see what's enabled
-        print(f"[DEBUG] Loading enabled packs from GraphDB...")
-        enabled_packs_from_db = set()
+        # Add feature_packs to path for imports (once, before the pack loop)
+        if feature_packs_dir not in sys.path:
+            sys.path[:0] = [feature_packs_dir]
+
+        # First, load every pack's state from GraphDB in one query to see what's enabled
+        logger.debug("Loading pack states from GraphDB...")
         try:
-            for pack in FeaturePackNode.get_enabled_packs():
-                enabled_packs_from_db.add(pack.name)
-                print(f"[DEBUG] Pack '{pack.name}' is enabled in GraphDB")
+            pack_states = FeaturePackNode.get_pack_states()
+            enabled_packs_from_db = {name for name, state in pack_states.items() if state['enabled']}
+            for name in enabled_packs_from_db:
+                logger.debug("Pack '%s' is enabled in GraphDB", name)
         except Exception as e:
-            print(f"[DEBUG] Could not load from GraphDB (first run?): {e}")
+            logger.warning("Could not load from GraphDB (first run?): %s", e)
+            pack_states = None
             enabled_packs_from_db = None  # First run, enable all by default
 
-        print(f"[DEBUG] Scanning filesystem for feature packs...")
+        logger.debug("Scanning filesystem for feature packs...")
         
-        # Add feature_packs to path for imports (once, outside the loop)
-        if feature_packs_dir not in sys.path:
-            sys.path.insert(0, feature_packs_dir)
-        
-        for pack_name in os.listdir(feature_packs_dir):
-            pack_path = os.path.join(feature_packs_dir, pack_name)
-            if os.path.isdir(pack_path):
-                print(f"[DEBUG] Processing pack: {pack_name}")
-                
+        pack_cache = _load_pack_cache()
+        pack_cache_dirty = False
+        packs_to_sync = []
+
+        with os.scandir(feature_packs_dir) as entries:
+            # Sorted so activation order (and the settings it mutates) is deterministic
+            pack_entries = sorted((entry.name, entry.path) for entry in entries if entry.is_dir())
+
+        # Phase A: read every pack's files in parallel (IO-bound), decide what
+        # each pack needs, then parse the packs that need it in parallel too.
+        executor = ThreadPoolExecutor(max_workers=max(1, min(PACK_LOAD_WORKERS, len(pack_entries))))
+        with executor:
+            pack_sources = dict(zip(
+                (pack_name for pack_name, _ in pack_entries),
+                executor.map(_read_pack_sources, (pack_path for _, pack_path in pack_entries)),
+            ))
+
+            packs_to_load = []
+            pack_status = {}
+            for pack_name, pack_path in pack_entries:
+                logger.debug("Processing pack: %s", pack_name)
+                content_hash = pack_sources[pack_name][1]
+
                 # Check if this pack should be synced to DB
                 try:
-                    needs_sync = should_sync_pack(pack_name, pack_path)
+                    needs_sync = should_sync_pack(pack_name, pack_path, pack_states, content_hash)
                 except Exception as e:
-                    print(f"[DEBUG] Error checking sync status: {e}, assuming sync needed")
+                    logger.warning("Error checking sync status: %s, assuming sync needed", e)
                     needs_sync = True
-                
-                # Load types.json
-                types_data = None
-                types_json_path = os.path.join(pack_path, 'types.json')
-                if os.path.exists(types_json_path):
-                    print(f"[DEBUG] Loading types.json for {pack_name}")
-                    with open(types_json_path, 'r') as f:
-                        types_data = json.load(f)
-
-                # Load config.py
-                config_data = None
-                config_path = os.path.join(pack_path, 'config.py')
-                if os.path.exists(config_path):
-                    print(f"[DEBUG] Loading config.py for {pack_name}")
-                    spec = importlib.util.spec_from_file_location(f"{pack_name}.config", config_path)
-                    config_module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(config_module)
-                    config_data = config_module.FEATURE_PACK_CONFIG
-
-                # Register hooks if declared in config
-                try:
-                    hooks_config = config_data.get('hooks', {}) if config_data else {}
-                    audit_hook_path = hooks_config.get('audit')
-                    if audit_hook_path:
-                        module_path, func_name = audit_hook_path.rsplit('.', 1)
-                        hooks_module = importlib.import_module(module_path)
-                        register_hooks = getattr(hooks_module, func_name, None)
-                        if callable(register_hooks):
-                            register_hooks(register_audit_hook)
-                            print(f"[DEBUG] Registered audit hooks for {pack_name}")
-                except Exception as e:
-                    print(f"[DEBUG] Could not register hooks for {pack_name}: {e}")
-
-                # Sync to GraphDB if needed
-                if needs_sync:
-                    try:
-                        print(f"[DEBUG] Syncing {pack_name} to GraphDB...")
-                        sync_feature_pack_to_db(
-                            pack_name=pack_name,
-                            pack_path=pack_path,
-                            config=config_data,
-                            types_data=types_data
-                        )
-                        print(f"[DEBUG] Successfully synced {pack_name} to GraphDB")
-                    except Exception as e:
-                        print(f"[DEBUG] Error syncing {pack_name} to GraphDB: {e}")
-
-                # Check if pack is enabled
-                pack_enabled = True
-                if enabled_packs_from_db is not None:
-                    # Use DB state
-                    pack_enabled = pack_name in enabled_packs_from_db
-                else:
-                    # First run, enable all
-                    pack_enabled = True
-
-                if not pack_enabled:
-                    print(f"[DEBUG] Pack {pack_name} is disabled, skipping activation")
+
+                # Check if pack is enabled; on first run (no DB state) enable all
+                pack_enabled = enabled_packs_from_db is None or pack_name in enabled_packs_from_db
+
+                # A disabled pack whose DB record is current needs nothing from its files
+                if not pack_enabled and not needs_sync:
+                    logger.debug("Pack %s is disabled and up to date, skipping", pack_name)
                     continue
 
-                # Register types
-                if types_data:
-                    for label, metadata in types_data.items():
-                        TypeRegistry.register(label, metadata, pack_name=pack_name)
-                        print(f"[DEBUG] Registered type: {label} from pack: {pack_name}")
-
-                # Add template dir
-                template_dir = os.path.join(pack_path, 'templates')
-                if os.path.exists(template_dir):
-                    print(f"[DEBUG] Adding template dir {template_dir} for {pack_name}")
-                    settings.TEMPLATES[0]['DIRS'].append(template_dir)
-
-                # Register tabs
-                if config_data and 'tabs' in config_data:
-                    if not hasattr(settings, 'FEATURE_PACK_TABS'):
-                        settings.FEATURE_PACK_TABS = []
-                    for tab in config_data['tabs']:
-                        tab['pack_name'] = pack_name
-                        # Store original for_labels for dynamic expansion
-                        tab['original_for_labels'] = tab.get('for_labels', [])
-                        settings.FEATURE_PACK_TABS.append(tab)
-                        print(f"[DEBUG] Added tab: {tab.get('id', 'unknown')}")
-
-                # Register modal overrides
-                if config_data and 'modals' in config_data:
-                    if not hasattr(settings, 'FEATURE_PACK_MODALS'):
-                        settings.FEATURE_PACK_MODALS = []
-                    for modal in config_data['modals']:
-                        modal['pack_name'] = pack_name
-                        modal['original_for_labels'] = modal.get('for_labels', [])
-                        settings.FEATURE_PACK_MODALS.append(modal)
-                        print(f"[DEBUG] Added modal override: {modal.get('type', 'unknown')}")
-
-                # Register URLs
-                if config_data and 'urls' in config_data:
-                    if not hasattr(settings, 'FEATURE_PACK_URLS'):
-                        settings.FEATURE_PACK_URLS = []
-                    urls_config = config_data.get('urls')
-                    if isinstance(urls_config, dict):
-                        urls_config = [urls_config]
-                    if isinstance(urls_config, list):
-                        for entry in urls_config:
-                            if isinstance(entry, str):
-                                settings.FEATURE_PACK_URLS.append({'prefix': '', 'module': entry})
-                            elif isinstance(entry, dict):
-                                module = entry.get('module')
-                                if module:
-                                    settings.FEATURE_PACK_URLS.append({
-                                        'prefix': entry.get('prefix', ''),
-                                        'module': module
-                                    })
-        
-        print(f"[DEBUG] Feature pack loading complete")
+                pack_status[pack_name] = (needs_sync, pack_enabled)
+                packs_to_load.append((pack_name, pack_path))
+
+            futures = {
+                pack_name: executor.submit(
+                    _parse_pack, pack_name, pack_path, *pack_sources[pack_name], pack_cache.get(pack_name)
+                )
+                for pack_name, pack_path in packs_to_load
+            }
+        parsed_packs = {pack_name: future.result() for pack_name, future in futures.items()}
+
+        # Phase B: register packs serially, in name order
+        for pack_name, pack_path in packs_to_load:
+            needs_sync, pack_enabled = pack_status[pack_name]
+            # Shared by every tab and modal dict of this pack, across reloads
+            pack_name = sys.intern(pack_name)
+            types_data, config_data, cache_entry = parsed_packs[pack_name]
+            if cache_entry is not None:
+                pack_cache[pack_name] = cache_entry
+                pack_cache_dirty = True
+
+            # Queue for the bulk GraphDB sync after the scan
+            if needs_sync:
+                packs_to_sync.append({
+                    'pack_name': pack_name,
+                    'pack_path': pack_path,
+                    'config': config_data,
+                    'types_data': types_data,
+                    'content_hash': pack_sources[pack_name][1],
+                })
+
+            if not pack_enabled:
+                logger.debug("Pack %s is disabled, skipping activation", pack_name)
+                continue
+
+            # Register hooks if declared in config
+            try:
+                hooks_config = config_data.get('hooks', {}) if config_data else {}
+                audit_hook_path = hooks_config.get('audit')
+                if audit_hook_path:
+                    module_path, func_name = audit_hook_path.rsplit('.', 1)
+                    hooks_module = importlib.import_module(module_path)
+                    register_hooks = getattr(hooks_module, func_name, None)
+                    if callable(register_hooks):
+                        register_hooks(register_audit_hook)
+                        logger.debug("Registered audit hooks for %s", pack_name)
+            except Exception as e:
+                logger.warning("Could not register hooks for %s: %s", pack_name, e)
+
+            # Register types
+            if types_data:
+                for label, metadata in types_data.items():
+                    TypeRegistry.register(label, metadata, pack_name=pack_name)
+                    registered_labels.add(label)
+                    logger.debug("Registered type: %s from pack: %s", label, pack_name)
+
+            # Add template dir
+            template_dir = os.path.join(pack_path, 'templates')
+            if os.path.exists(template_dir):
+                logger.debug("Adding template dir %s for %s", template_dir, pack_name)
+                settings.TEMPLATES[0]['DIRS'].append(template_dir)
+                if not hasattr(settings, 'FEATURE_PACK_TEMPLATE_DIRS'):
+                    settings.FEATURE_PACK_TEMPLATE_DIRS = []
+                settings.FEATURE_PACK_TEMPLATE_DIRS.append(template_dir)
+
+            # Register tabs
+            if config_data and 'tabs' in config_data:
+                if not hasattr(settings, 'FEATURE_PACK_TABS'):
+                    settings.FEATURE_PACK_TABS = []
+                for tab in config_data['tabs']:
+                    tab['pack_name'] = pack_name
+                    # Store original for_labels for dynamic expansion, as an immutable copy
+                    tab['original_for_labels'] = tuple(tab.get('for_labels', []))
+                    settings.FEATURE_PACK_TABS.append(tab)
+                    logger.debug("Added tab: %s", tab.get('id', 'unknown'))
+
+            # Register modal overrides
+            if config_data and 'modals' in config_data:
+                if not hasattr(settings, 'FEATURE_PACK_MODALS'):
+                    settings.FEATURE_PACK_MODALS = []
+                for modal in config_data['modals']:
+                    modal['pack_name'] = pack_name
+                    modal['original_for_labels'] = tuple(modal.get('for_labels', []))
+                    settings.FEATURE_PACK_MODALS.append(modal)
+                    logger.debug("Added modal override: %s", modal.get('type', 'unknown'))
+
+            # Register URLs
+            if config_data and 'urls' in config_data:
+                if not hasattr(settings, 'FEATURE_PACK_URLS'):
+                    settings.FEATURE_PACK_URLS = []
+                urls_config = config_data.get('urls')
+                if isinstance(urls_config, dict):
+                    urls_config = [urls_config]
+                if isinstance(urls_config, list):
+                    for entry in urls_config:
+                        if isinstance(entry, str):
+                            settings.FEATURE_PACK_URLS.append({'prefix': '', 'module': entry})
+                        elif isinstance(entry, dict):
+                            module = entry.get('module')
+                            if module:
+                                settings.FEATURE_PACK_URLS.append({
+                                    'prefix': entry.get('prefix', ''),
+                                    'module': module
+                                })
+
+        if defer_sync:
+            self._pending_pack_sync = packs_to_sync
+        else:
+            _sync_packs_to_db(packs_to_sync)
+
+        if pack_cache_dirty:
+            _save_pack_cache(pack_cache)
+
+        logger.debug("Feature pack loading complete")
 
         try:
             from cmdb.feature_pack_urls import refresh_feature_pack_urls
             refresh_feature_pack_urls()
         except Exception as e:
-            print(f"[DEBUG] Could not refresh feature pack URLs: {e}")
+            logger.warning("Could not refresh feature pack URLs: %s", e)
+
+        return registered_labels
+
+    def _warm_up_pack_views(self):
+        """
+        Build the URL resolver and import the pack views named by tabs and modals
+        now, so the first request that needs them does not pay for the imports.
+        """
+        from django.urls import get_resolver
+        from django.utils.module_loading import import_string
+
+        try:
+            get_resolver().url_patterns
+        except Exception as e:
+            logger.warning("Could not load URL patterns: %s", e)
+
+        entries = getattr(settings, 'FEATURE_PACK_TABS', []) + getattr(settings, 'FEATURE_PACK_MODALS', [])
+        for view_path in {entry['custom_view'] for entry in entries if entry.get('custom_view')}:
+            try:
+                import_string(view_path)
+            except Exception as e:
+                logger.warning("Could not import pack view %s: %s", view_path, e)
+
+    def warm_up(self):
+        """
+        Sync feature packs and import their views at server start; called from
+        the WSGI/ASGI entry points.
+        """
+        self._sync_packs_once()
+        self._warm_up_pack_views()
@@ -78,6 +78,10 @@ FEATURE_PACKS_DIR = BASE_DIR / "feature_packs"
 FEATURE_PACK_STORE_DIR = BASE_DIR / "feature_packs_store"
 FEATURE_PACK_STORE_REPO = "https://github.com/erichester76/GraphCMDB-feature-packs.git"
 FEATURE_PACK_STORE_BRANCH = "main"
+# Parsed types.json/config.py of each pack, reused while the files are unchanged
+FEATURE_PACK_CACHE_FILE = Path.home() / ".cache" / "graphcmdb" / "feature_packs.pickle"
+# Run audit hooks (e.g. the audit log pack's writes) on a background thread
+AUDIT_HOOKS_ASYNC = True
 
 ROOT_URLCONF = 'core.urls'
 
@@ -0,0 +1,247 @@
+"""
+Tests for feature pack loading at startup.
+"""
+import copy
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, override_settings
+from django.urls import resolve
+
+from cmdb.feature_pack_urls import refresh_feature_pack_urls
+from cmdb.registry import TypeRegistry
+import core
+from core import apps as core_apps
+
+
+class FeaturePackTestBase(SimpleTestCase):
+    """Set up a feature_packs directory holding one pack, with GraphDB mocked out."""
+
+    pack_name = 'loader_test_pack'
+
+    def setUp(self):
+        """Create a feature_packs directory with one pack and point the cache at a temp file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.packs_dir = os.path.join(self.temp_dir, 'feature_packs')
+        self.pack_path = os.path.join(self.packs_dir, self.pack_name)
+        os.makedirs(self.pack_path)
+        self.write_pack_file('types.json', '{"LoaderWidget": {"display_name": "Widget"}}')
+        self.write_pack_file('config.py', "FEATURE_PACK_CONFIG = {'name': 'Loader Test', 'version': '1.0'}\n")
+        self.cache_file = os.path.join(self.temp_dir, 'cache', 'feature_packs.pickle')
+
+        # Overriding TEMPLATES also resets the engines, as at process start; the copy
+        # keeps appended pack template dirs out of the real settings
+        settings_override = override_settings(
+            TEMPLATES=copy.deepcopy(settings.TEMPLATES),
+            BASE_DIR=self.temp_dir,
+            FEATURE_PACK_CACHE_FILE=self.cache_file,
+            FEATURE_PACK_TABS=[],
+            FEATURE_PACK_MODALS=[],
+            FEATURE_PACK_URLS=[],
+            FEATURE_PACK_TEMPLATE_DIRS=[],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # GraphDB is outside what these tests cover
+        self.pack_states = {
+            self.pack_name: {'enabled': True, 'content_hash': None, 'last_modified': None},
+        }
+        for target, kwargs in (
+            ('cmdb.feature_pack_models.FeaturePackNode.get_pack_states', {'side_effect': lambda: self.pack_states}),
+            ('cmdb.feature_pack_models.sync_feature_packs_to_db_bulk', {}),
+        ):
+            patcher = patch(target, **kwargs)
+            mock = patcher.start()
+            self.addCleanup(patcher.stop)
+            if target.endswith('sync_feature_packs_to_db_bulk'):
+                self.sync_bulk = mock
+
+        self.addCleanup(TypeRegistry.unregister, 'LoaderWidget')
+        self.addCleanup(TypeRegistry.unregister, 'LoaderGadget')
+        self.addCleanup(self.remove_from_sys_path)
+
+    def write_pack_file(self, filename, content):
+        with open(os.path.join(self.pack_path, filename), 'w', encoding='utf-8') as handle:
+            handle.write(content)
+
+    def remove_from_sys_path(self):
+        if self.packs_dir in sys.path:
+            sys.path.remove(self.packs_dir)
+
+
+class FeaturePackLoadingTest(FeaturePackTestBase):
+    """Test the parsed pack cache and the enabled/sync decisions in load_feature_packs."""
+
+    def load(self):
+        """Run load_feature_packs, returning the mock wrapped around pack parsing."""
+        with patch('core.apps._parse_pack_sources', wraps=core_apps._parse_pack_sources) as parse:
+            apps.get_app_config('core').load_feature_packs()
+        return parse
+
+    def test_cache_miss_parses_pack_and_writes_cache(self):
+        """Without a cache the pack is parsed and the cache file is written."""
+        parse = self.load()
+
+        self.assertEqual(parse.call_count, 1)
+        self.assertIn('LoaderWidget', TypeRegistry.known_labels())
+        with open(self.cache_file, 'rb') as handle:
+            cache = pickle.load(handle)
+        _, content_hash = core_apps._read_pack_sources(self.pack_path)
+        self.assertEqual(cache[self.pack_name]['content_hash'], content_hash)
+        self.assertEqual(cache[self.pack_name]['config_data']['name'], 'Loader Test')
+
+    def test_cache_hit_skips_parsing(self):
+        """An unchanged pack is taken from the cache without running config.py."""
+        self.load()
+        TypeRegistry.unregister('LoaderWidget')
+
+        parse = self.load()
+
+        parse.assert_not_called()
+        self.assertIn('LoaderWidget', TypeRegistry.known_labels())
+
+    def test_changed_file_invalidates_cache(self):
+        """Editing types.json changes the content hash, so the pack is parsed again."""
+        self.load()
+        self.write_pack_file('types.json', '{"LoaderGadget": {"display_name": "Gadget"}}')
+
+        parse = self.load()
+
+        self.assertEqual(parse.call_count, 1)
+        self.assertIn('LoaderGadget', TypeRegistry.known_labels())
+
+    def test_disabled_current_pack_is_skipped(self):
+        """A disabled pack whose stored hash matches is neither parsed, registered nor synced."""
+        _, content_hash = core_apps._read_pack_sources(self.pack_path)
+        self.pack_states = {
+            self.pack_name: {'enabled': False, 'content_hash': content_hash, 'last_modified': None},
+        }
+
+        parse = self.load()
+
+        parse.assert_not_called()
+        self.sync_bulk.assert_not_called()
+        self.assertNotIn('LoaderWidget', TypeRegistry.known_labels())
+
+
+class ReloadFeaturePacksTest(FeaturePackTestBase):
+    """Test that reloading packs keeps unchanged types registered as they were."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch('core.apps.CoreConfig.ensure_indexes')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unchanged_types_are_skipped(self):
+        """A reload with the same types.json leaves the registry and its version untouched."""
+        core_apps.reload_feature_packs()
+        version = TypeRegistry.version
+        metadata = TypeRegistry.get_metadata('LoaderWidget')
+
+        core_apps.reload_feature_packs()
+
+        self.assertEqual(TypeRegistry.version, version)
+        self.assertIs(TypeRegistry.get_metadata('LoaderWidget'), metadata)
+
+    def test_changed_types_replace_removed_ones(self):
+        """Types no longer declared by any pack are dropped and new ones registered."""
+        core_apps.reload_feature_packs()
+        self.write_pack_file('types.json', '{"LoaderGadget": {"display_name": "Gadget"}}')
+
+        core_apps.reload_feature_packs()
+
+        self.assertIn('LoaderGadget', TypeRegistry.known_labels())
+        self.assertNotIn('LoaderWidget', TypeRegistry.known_labels())
+
+
+class FeaturePackStartupTest(FeaturePackTestBase):
+    """Test that packs loaded in ready() are visible to engines and resolvers built by system checks."""
+
+    def setUp(self):
+        """Give the pack a template and a URL module."""
+        # Registered first so it runs last, once the settings overrides are undone
+        self.addCleanup(refresh_feature_pack_urls)
+        super().setUp()
+        self.write_pack_file(
+            'config.py',
+            "FEATURE_PACK_CONFIG = {'name': 'Loader Test', 'version': '1.0', "
+            "'urls': {'prefix': 'loader-test/', 'module': 'loader_test_pack.urls'}}\n",
+        )
+        self.write_pack_file('__init__.py', '')
+        self.write_pack_file(
+            'urls.py',
+            "from django.http import HttpResponse\n"
+            "from django.urls import path\n\n"
+            "urlpatterns = [path('ping/', lambda request: HttpResponse('pong'), name='loader_test_ping')]\n",
+        )
+        os.makedirs(os.path.join(self.pack_path, 'templates', self.pack_name))
+        self.write_pack_file(os.path.join('templates', self.pack_name, 'tab.html'), 'Widget tab for {{ name }}')
+        self.addCleanup(self.forget_pack_modules)
+
+        environ = patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        os.environ.pop('SKIP_FEATURE_PACKS', None)
+
+        self.config = apps.get_app_config('core')
+        self.addCleanup(setattr, self.config, '_pending_pack_sync', [])
+
+    def forget_pack_modules(self):
+        for name in [name for name in sys.modules if name.split('.')[0] == self.pack_name]:
+            del sys.modules[name]
+
+    def test_pack_templates_and_urls_work_after_system_checks(self):
+        """runserver and the test runner run checks before the first request; pack templates and URLs still resolve."""
+        self.config.ready()
+        call_command('check', stdout=StringIO())
+
+        html = render_to_string(f'{self.pack_name}/tab.html', {'name': 'sw1'})
+        self.assertEqual(html, 'Widget tab for sw1')
+        self.assertEqual(resolve('/cmdb/loader-test/ping/').url_name, 'loader_test_ping')
+
+    def test_graphdb_sync_waits_for_first_request(self):
+        """ready() only queues the pack; the first request writes it once."""
+        self.config.ready()
+        self.sync_bulk.assert_not_called()
+
+        self.config._sync_packs_once()
+        self.config._sync_packs_once()
+
+        self.sync_bulk.assert_called_once()
+        self.assertEqual([pack['pack_name'] for pack in self.sync_bulk.call_args.args[0]], [self.pack_name])
+
+
+class SyncPacksOnceTest(SimpleTestCase):
+    """Test that concurrent first requests write the queued packs to GraphDB exactly once."""
+
+    def test_concurrent_requests_sync_once(self):
+        """Only the first caller takes the queued packs."""
+        config = core_apps.CoreConfig('core', core)
+        config._pending_pack_sync = [{'pack_name': 'network_pack'}]
+
+        def slow_sync(packs):
+            time.sleep(0.05)
+
+        with patch('cmdb.feature_pack_models.sync_feature_packs_to_db_bulk', side_effect=slow_sync) as sync_bulk:
+            threads = [threading.Thread(target=config._sync_packs_once) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        sync_bulk.assert_called_once_with([{'pack_name': 'network_pack'}])
+        self.assertEqual(config._pending_pack_sync, [])
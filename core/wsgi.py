@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
 application = get_wsgi_application()
+
+# Sync feature packs and import their views while the worker boots rather than on its first request
+from django.apps import apps  # noqa: E402
+
+apps.get_app_config('core').warm_up()
@@ -20,6 +20,7 @@ django.setup()
 
 from django.contrib.auth.models import User
 from django.core.management import call_command
+from django.db import IntegrityError
 import getpass
 
 
@@ -34,14 +35,16 @@ def print_banner():
 
 def check_existing_users():
     """Check if any users already exist."""
-    user_count = User.objects.count()
+    # One extra row tells us whether a separate count is needed at all
+    users = list(User.objects.order_by('id').values_list('username', 'is_active', 'is_superuser')[:6])
+    user_count = User.objects.count() if len(users) > 5 else len(users)
     if user_count > 0:
         print(f"⚠️  WARNING: {user_count} user(s) already exist in the database.")
         print("\nExisting users:")
-        for user in User.objects.all()[:5]:
-            status = "✓ Active" if user.is_active else "✗ Inactive"
-            admin = " (Admin)" if user.is_superuser else ""
-            print(f"  - {user.username}{admin} - {status}")
+        for username, is_active, is_superuser in users[:5]:
+            status = "✓ Active" if is_active else "✗ Inactive"
+            admin = " (Admin)" if is_superuser else ""
+            print(f"  - {username}{admin} - {status}")
         
         if user_count > 5:
             print(f"  ... and {user_count - 5} more")
@@ -54,22 +57,30 @@ def check_existing_users():
     return True
 
 
-def get_user_input():
-    """Get user input for admin account."""
-    print("\n" + "-"*60)
-    print("Please provide the following information:")
-    print("-"*60 + "\n")
-    
-    # Username
+def get_username(taken=()):
+    """
+    Prompt for a username. Whether it is free is checked when the user is
+    created; names already rejected this session are refused up front.
+    """
     while True:
         username = input("Username: ").strip()
         if not username:
             print("❌ Username cannot be empty. Please try again.\n")
             continue
-        if User.objects.filter(username=username).exists():
+        if username in taken:
             print(f"❌ User '{username}' already exists. Please choose a different username.\n")
             continue
-        break
+        return username
+
+
+def get_user_input():
+    """Get user input for admin account."""
+    print("\n" + "-"*60)
+    print("Please provide the following information:")
+    print("-"*60 + "\n")
+    
+    # Username
+    username = get_username()
     
     # Email (optional)
     email = input("Email address (optional, press Enter to skip): ").strip()
@@ -99,6 +110,9 @@ def create_admin_user(username, email, password):
             password=password
         )
         return user
+    except IntegrityError:
+        # Duplicate username; the caller asks for another one
+        raise
     except Exception as e:
         print(f"\n❌ Error creating user: {e}")
         return None
@@ -158,9 +172,22 @@ def main():
         print("\n\nSetup cancelled by user.")
         sys.exit(0)
     
-    # Create the user
-    print("\nCreating admin user...")
-    user = create_admin_user(username, email, password)
+    # Create the user, asking for another username until one is free
+    taken = set()
+    while True:
+        print("\nCreating admin user...")
+        try:
+            user = create_admin_user(username, email, password)
+        except IntegrityError:
+            print(f"❌ User '{username}' already exists. Please choose a different username.\n")
+            taken.add(username)
+            try:
+                username = get_username(taken)
+            except KeyboardInterrupt:
+                print("\n\nSetup cancelled by user.")
+                sys.exit(0)
+            continue
+        break
     
     if user:
         print_success(username)
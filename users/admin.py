@@ -2,16 +2,31 @@ from django.contrib import admin
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.admin import GroupAdmin as BaseGroupAdmin
+from django.contrib.admin.views.main import ChangeList
 
 # Re-register with default admin
 admin.site.unregister(User)
 admin.site.unregister(Group)
 
+
+class OnlyFieldsChangeList(ChangeList):
+    """Change list that loads only the model admin's changelist_fields."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        qs = super().get_queryset(request, exclude_parameters)
+        return qs.only(*self.model_admin.changelist_fields)
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'is_active')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups')
     search_fields = ('username', 'first_name', 'last_name', 'email')
+    # Model fields loaded by the change list; the change form still loads every field
+    changelist_fields = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'is_active')
+
+    def get_changelist(self, request, **kwargs):
+        return OnlyFieldsChangeList
 
 @admin.register(Group)
 class GroupAdmin(BaseGroupAdmin):
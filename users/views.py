@@ -1,13 +1,78 @@
+import time
+
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.models import User, Group, Permission
 from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count
 from django.http import JsonResponse, HttpResponse
 from functools import wraps
-from cmdb.models import DynamicNode
+from cmdb.models import DynamicNode, get_mirrored_properties
 from neomodel import db
 
+# Index seek on the top-level username, for User types that mirror it
+_USER_NODE_QUERY = """
+    MATCH (u:User {username: $username})
+    RETURN elementId(u) AS user_id
+    LIMIT 1
+"""
+
+# Fallback: exact matching on username property in JSON (parses every User node)
+_USER_NODE_BY_JSON_QUERY = """
+    MATCH (u:User)
+    WHERE apoc.convert.fromJsonMap(u.custom_properties).username = $username
+    RETURN elementId(u) AS user_id
+    LIMIT 1
+"""
+
+USER_NODE_CACHE_TIMEOUT = 30  # Seconds a user's graph node ID is cached
+USER_NODE_FAILURE_THRESHOLD = 3  # Consecutive Neo4j failures before profile lookups are skipped
+USER_NODE_RETRY_AFTER = 30  # Seconds profile lookups are skipped once that threshold is hit
+USER_ADMIN_PAGE_SIZE = 50  # Rows per page on the user and group lists
+
+
+class _CircuitBreaker:
+    """
+    Skip an optional call for a cool-down period after repeated failures, so
+    an unreachable Neo4j costs each request nothing instead of a timeout.
+    """
+
+    def __init__(self, failure_threshold, retry_after):
+        self.failure_threshold = failure_threshold
+        self.retry_after = retry_after
+        self.failures = 0
+        self.open_until = 0.0
+
+    def allow(self):
+        """Return True if the call should be attempted."""
+        return time.monotonic() >= self.open_until
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.failures = 0
+            self.open_until = time.monotonic() + self.retry_after
+
+
+_user_node_breaker = _CircuitBreaker(USER_NODE_FAILURE_THRESHOLD, USER_NODE_RETRY_AFTER)
+
+
+def _find_user_node_id(username):
+    """Return the element ID of the User node for username, or None."""
+    if 'username' in get_mirrored_properties('User'):
+        query = _USER_NODE_QUERY
+    else:
+        query = _USER_NODE_BY_JSON_QUERY
+    results, _ = db.cypher_query(query, {'username': username})
+    return results[0][0] if results else None
+
 
 def login_view(request):
     """Handle user login."""
@@ -30,7 +95,7 @@ def logout_view(request):
     """Handle user logout."""
     logout(request)
     messages.success(request, 'You have been logged out successfully.')
-    return redirect('users:login')
+    return redirect(settings.LOGOUT_REDIRECT_URL)
 
 
 @login_required
@@ -38,33 +103,42 @@ def user_profile(request):
     """Display current user's profile."""
     # Try to find user node in graph
     user_node = None
-    try:
-        # Use exact matching on username property in JSON
-        query = """
-            MATCH (u:User)
-            WHERE apoc.convert.fromJsonMap(u.custom_properties).username = $username
-            RETURN elementId(u) AS user_id, u.custom_properties AS props
-            LIMIT 1
-        """
-        results, _ = db.cypher_query(query, {'username': request.user.username})
-        
-        if results:
-            user_node_id = results[0][0]
-            node_class = DynamicNode.get_or_create_label('User')
-            user_node = node_class.get_by_element_id(user_node_id)
-    except Exception as e:
-        # Neo4j might not be available, that's okay for auth
-        pass
+    if _user_node_breaker.allow():
+        try:
+            # The username to node mapping rarely changes; a new User node shows up within the timeout
+            user_node_id = cache.get_or_set(
+                f"user_node_id:{request.user.pk}",
+                lambda: _find_user_node_id(request.user.username),
+                USER_NODE_CACHE_TIMEOUT,
+            )
+            
+            if user_node_id:
+                node_class = DynamicNode.get_or_create_label('User')
+                user_node = node_class.get_by_element_id(user_node_id)
+            _user_node_breaker.record_success()
+        except Exception as e:
+            # Neo4j might not be available, that's okay for auth
+            _user_node_breaker.record_failure()
     
     context = {
         'django_user': request.user,
         'user_node': user_node,
-        'user_groups': request.user.groups.all(),
+        # Groups with their permission counts in one query
+        'user_groups': request.user.groups.annotate(permission_count=Count('permissions')),
     }
     return render(request, 'users/user_profile.html', context)
 
 
 # Permission checking utilities for RBAC
+
+# Node actions, with the verb used for each in access denied messages
+NODE_ACTION_NAMES = {
+    'view': 'view',
+    'add': 'create',
+    'change': 'modify',
+    'delete': 'delete',
+}
+
 def has_node_permission(user, action, label=None):
     """
     Check if user has permission to perform action on node type.
@@ -77,6 +151,19 @@ def has_node_permission(user, action, label=None):
     Returns:
         bool: True if user has permission
     """
+    # Memoized on the user object, which lives for one request; the decorator,
+    # context processors and template tags all ask about the same user
+    cache = getattr(user, '_node_perm_cache', None)
+    if cache is None:
+        cache = user._node_perm_cache = {}
+    key = (action, label)
+    if key not in cache:
+        cache[key] = _check_node_permission(user, action, label)
+    return cache[key]
+
+
+def _check_node_permission(user, action, label):
+    """Uncached body of has_node_permission()."""
     # Superusers have all permissions
     if user.is_superuser:
         return True
@@ -94,14 +181,26 @@ def has_node_permission(user, action, label=None):
     
     # If no label specified, check if user has ANY permission with this action
     if label is None:
-        # Check if user has any permissions starting with this action
-        for perm in user.get_all_permissions():
-            if perm.startswith(f'cmdb.{action}_'):
-                return True
+        return action in _cmdb_actions_for(user)
     
     return False
 
 
+def _cmdb_actions_for(user):
+    """
+    Return the set of actions ('view', 'add', ...) the user holds on at least
+    one cmdb node type, computed once per user object.
+    """
+    actions = getattr(user, '_cmdb_actions', None)
+    if actions is None:
+        actions = user._cmdb_actions = frozenset(
+            perm[len('cmdb.'):].split('_', 1)[0]
+            for perm in user.get_all_permissions()
+            if perm.startswith('cmdb.')
+        )
+    return actions
+
+
 def node_permission_required(action, label_param='label'):
     """
     Decorator to check if user has permission for a node action.
@@ -110,22 +209,18 @@ def node_permission_required(action, label_param='label'):
         action: 'view', 'add', 'change', or 'delete'
         label_param: Name of the URL parameter containing the label
     """
+    if action not in NODE_ACTION_NAMES:
+        raise ValueError(f"Unknown node action: {action}. Must be one of {', '.join(NODE_ACTION_NAMES)}.")
+    action_name = NODE_ACTION_NAMES[action]
+
     def decorator(view_func):
+        # Anonymous users go to LOGIN_URL before any permission work is done
+        @login_required
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            if not request.user.is_authenticated:
-                return redirect(f'/users/login/?next={request.path}')
-            
             label = kwargs.get(label_param)
             if not has_node_permission(request.user, action, label):
                 # Provide more specific error message
-                action_name = {
-                    'view': 'view',
-                    'add': 'create',
-                    'change': 'modify',
-                    'delete': 'delete'
-                }.get(action, action)
-                
                 if label:
                     error_msg = f'Access Denied: You do not have permission to {action_name} {label} nodes.'
                 else:
@@ -159,29 +254,50 @@ def node_permission_required(action, label_param='label'):
     return decorator
 
 
-@login_required
+def staff_required(denied_message):
+    """
+    Decorator limiting a view to staff users. Anonymous users are sent to
+    LOGIN_URL; other non-staff users to the dashboard with denied_message.
+    
+    Args:
+        denied_message: Error message shown after the redirect
+    """
+    def decorator(view_func):
+        @login_required
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not request.user.is_staff:
+                messages.error(request, denied_message)
+                return redirect('cmdb:dashboard')
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@staff_required('Access Denied: Only staff members can view the user list.')
 def user_list(request):
     """List all users (staff only)."""
-    if not request.user.is_staff:
-        messages.error(request, 'Access Denied: Only staff members can view the user list.')
-        return redirect('cmdb:dashboard')
-    
-    users = User.objects.all().prefetch_related('groups')
+    users = User.objects.only(
+        'id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser'
+    ).prefetch_related('groups').order_by('username')
+    page_obj = Paginator(users, USER_ADMIN_PAGE_SIZE).get_page(request.GET.get('page'))
     context = {
-        'users': users,
+        'users': page_obj.object_list,
+        'page_obj': page_obj,
     }
     return render(request, 'users/user_list.html', context)
 
 
-@login_required
+@staff_required('Access Denied: Only staff members can view groups.')
 def group_list(request):
     """List all groups (staff only)."""
-    if not request.user.is_staff:
-        messages.error(request, 'Access Denied: Only staff members can view groups.')
-        return redirect('cmdb:dashboard')
-    
-    groups = Group.objects.all().prefetch_related('permissions', 'user_set')
+    # Permissions are only counted, so count them in SQL instead of loading them
+    groups = Group.objects.annotate(
+        permission_count=Count('permissions', distinct=True)
+    ).prefetch_related('user_set').order_by('name')
+    page_obj = Paginator(groups, USER_ADMIN_PAGE_SIZE).get_page(request.GET.get('page'))
     context = {
-        'groups': groups,
+        'groups': page_obj.object_list,
+        'page_obj': page_obj,
     }
     return render(request, 'users/group_list.html', context)